@@ -2,26 +2,37 @@
 MCPサーバーのエントリーポイントとユーティリティコマンド
 """
 
+import shutil
 import subprocess
+import sys
+import tempfile
+from collections.abc import Sequence
+from typing import IO
 
 # 品質チェック対象ディレクトリの定数
 QUALITY_CHECK_DIRS = ["src"]
 
+# 各コマンドの引数（呼び出しごとにリストを組み立てないよう事前に作成）
+_RUFF_CHECK = ("ruff", "check", *QUALITY_CHECK_DIRS)
+_RUFF_FIX = ("ruff", "check", "--fix", "--unsafe-fixes", *QUALITY_CHECK_DIRS)
+_RUFF_FORMAT = ("ruff", "format", *QUALITY_CHECK_DIRS)
+_TY_CHECK = ("ty", "check", *QUALITY_CHECK_DIRS)
+
 
 def lint():
     """
     ruffでコードの静的解析を実行する
     """
-    cmd = ["ruff", "check"] + QUALITY_CHECK_DIRS
-    subprocess.run(cmd)
+    result = subprocess.run(_RUFF_CHECK)
+    sys.exit(result.returncode)
 
 
 def format():
     """
     ruffでコードフォーマットを実行する
     """
-    cmd = ["ruff", "format"] + QUALITY_CHECK_DIRS
-    subprocess.run(cmd)
+    result = subprocess.run(_RUFF_FORMAT)
+    sys.exit(result.returncode)
 
 
 def fix():
@@ -31,27 +42,30 @@ def fix():
     print("🔧 コードの自動修正とフォーマットを実行中...")
 
     # 自動修正（安全な修正 + 危険な修正も含む）
-    fix_cmd = ["ruff", "check", "--fix", "--unsafe-fixes"] + QUALITY_CHECK_DIRS
-    fix_result = subprocess.run(fix_cmd)
+    # フォーマットは自動修正の結果に依存するため、並列化せず順番に実行する
+    fix_result = subprocess.run(_RUFF_FIX)
 
     # フォーマット
-    format_cmd = ["ruff", "format"] + QUALITY_CHECK_DIRS
-    format_result = subprocess.run(format_cmd)
+    format_result = subprocess.run(_RUFF_FORMAT)
 
-    if fix_result.returncode == 0 and format_result.returncode == 0:
-        print("✅ 自動修正とフォーマットが完了しました")
-    else:
-        print("❌ 自動修正またはフォーマットでエラーが発生しました")
+    if fix_result.returncode != 0:
+        print("❌ 自動修正で修正できないエラーが残っています")
+        exit(fix_result.returncode)
 
-    exit(fix_result.returncode or format_result.returncode)
+    if format_result.returncode != 0:
+        print("❌ フォーマットでエラーが発生しました")
+        exit(format_result.returncode)
+
+    print("✅ 自動修正とフォーマットが完了しました")
+    exit(0)
 
 
 def type_check():
     """
     メイン型チェックを実行する (ty - 高速)
     """
-    cmd = ["ty", "check"] + QUALITY_CHECK_DIRS
-    subprocess.run(cmd)
+    result = subprocess.run(_TY_CHECK)
+    sys.exit(result.returncode)
 
 
 
@@ -72,50 +86,78 @@ def test():
     exit(result.returncode)
 
 
+def _start_captured(cmd: Sequence[str]) -> tuple[subprocess.Popen, IO[bytes]]:
+    """
+    出力を一時ファイルに書き出しながらコマンドを起動する
+
+    出力は失敗時にのみ読み出すため、成功時はメモリに保持しない
+    """
+    output = tempfile.TemporaryFile()
+    proc = subprocess.Popen(cmd, stdout=output, stderr=subprocess.STDOUT)
+    return proc, output
+
+
+def _print_output(output: IO[bytes]) -> None:
+    """
+    一時ファイルに書き出されたコマンド出力をそのまま標準出力へ書き出す
+
+    デコードや文字列の組み立てを行わず、バイト列のままコピーする
+    """
+    sys.stdout.flush()
+    output.seek(0)
+    shutil.copyfileobj(output, sys.stdout.buffer)
+    sys.stdout.buffer.flush()
+
+
 def check():
     """
     型チェック、Lint、テストを同時に実行する（修正はしない）
     """
+    # 3つのチェックは互いに独立しているため並列に起動する
     print("🔍 型チェックを実行中...")
-    type_result = subprocess.run(["ty", "check"] + QUALITY_CHECK_DIRS, capture_output=True)
+    type_proc, type_output = _start_captured(_TY_CHECK)
 
     print("📝 Lintを実行中...")
-    lint_result = subprocess.run(["ruff", "check"] + QUALITY_CHECK_DIRS, capture_output=True)
+    lint_proc, lint_output = _start_captured(_RUFF_CHECK)
 
     print("🧪 テストを実行中...")
-    test_result = subprocess.run(["pytest", "-v", "--tb=short"], capture_output=True)
+    test_proc, test_output = _start_captured(["pytest", "-v", "--tb=short"])
+
+    # すべての完了を待つ
+    for proc in [type_proc, lint_proc, test_proc]:
+        proc.wait()
 
     # 結果をまとめて表示
     print("\n" + "=" * 50)
     print("📊 実行結果サマリー")
     print("=" * 50)
 
-    type_status = "✅ PASS" if type_result.returncode == 0 else "❌ FAIL"
-    lint_status = "✅ PASS" if lint_result.returncode == 0 else "❌ FAIL"
-    test_status = "✅ PASS" if test_result.returncode == 0 else "❌ FAIL"
+    type_status = "✅ PASS" if type_proc.returncode == 0 else "❌ FAIL"
+    lint_status = "✅ PASS" if lint_proc.returncode == 0 else "❌ FAIL"
+    test_status = "✅ PASS" if test_proc.returncode == 0 else "❌ FAIL"
 
     print(f"型チェック: {type_status}")
     print(f"Lint:       {lint_status}")
     print(f"テスト:     {test_status}")
 
     # エラーがある場合は詳細を表示
-    if type_result.returncode != 0:
+    if type_proc.returncode != 0:
         print("\n🔍 型チェックエラー:")
-        print(type_result.stdout.decode())
-        print(type_result.stderr.decode())
+        _print_output(type_output)
 
-    if lint_result.returncode != 0:
+    if lint_proc.returncode != 0:
         print("\n📝 Lintエラー:")
-        print(lint_result.stdout.decode())
-        print(lint_result.stderr.decode())
+        _print_output(lint_output)
 
-    if test_result.returncode != 0:
+    if test_proc.returncode != 0:
         print("\n🧪 テストエラー:")
-        print(test_result.stdout.decode())
-        print(test_result.stderr.decode())
+        _print_output(test_output)
+
+    for output in [type_output, lint_output, test_output]:
+        output.close()
 
     # いずれかが失敗した場合は非ゼロで終了
-    if any(result.returncode != 0 for result in [type_result, lint_result, test_result]):
+    if any(proc.returncode != 0 for proc in [type_proc, lint_proc, test_proc]):
         exit(1)
     else:
         print("\n🎉 すべてのチェックが成功しました！")
@@ -3,6 +3,8 @@
 """
 
 import os
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -10,133 +12,238 @@ from dotenv import load_dotenv
 # .envファイルを読み込み
 load_dotenv()
 
+# メールアドレスをOneDriveユーザー名に変換するテーブル（"@" と "." を "_" に置換）
+_EMAIL_TO_ONEDRIVE_USER = str.maketrans({"@": "_", ".": "_"})
 
-class SharePointConfig:
-    """SharePoint設定クラス"""
-
-    def __init__(self):
-        # SharePoint設定
-        self.base_url = os.getenv(
-            "SHAREPOINT_BASE_URL", ""
-        )  # https://company.sharepoint.com
-        self.site_name = os.getenv("SHAREPOINT_SITE_NAME", "")  # sitename（オプション）
-
-        # OneDrive設定
-        self.onedrive_paths = os.getenv("SHAREPOINT_ONEDRIVE_PATHS", "")
-        self.tenant_id = os.getenv("SHAREPOINT_TENANT_ID", "")
-
-        # 認証モード設定
-        self.auth_mode = os.getenv("SHAREPOINT_AUTH_MODE", "certificate")
-
-        # 証明書認証設定（certificateモード）
-        self.client_id = os.getenv("SHAREPOINT_CLIENT_ID", "")
-        self.certificate_path = os.getenv("SHAREPOINT_CERTIFICATE_PATH", "")
-        self.certificate_text = os.getenv("SHAREPOINT_CERTIFICATE_TEXT", "")
-        self.private_key_path = os.getenv("SHAREPOINT_PRIVATE_KEY_PATH", "")
-        self.private_key_text = os.getenv("SHAREPOINT_PRIVATE_KEY_TEXT", "")
-
-        # OAuth認証設定（oauthモード）
-        self._oauth_client_id_env = os.getenv("SHAREPOINT_OAUTH_CLIENT_ID", "")
-        self.oauth_client_secret = os.getenv("SHAREPOINT_OAUTH_CLIENT_SECRET", "")
-        self.oauth_server_base_url = os.getenv(
-            "SHAREPOINT_OAUTH_SERVER_BASE_URL", "http://localhost:8000"
-        )
-        # Allowed redirect URIs (comma-separated, supports wildcards)
-        # None = allow all (default for development convenience)
-        self.oauth_allowed_redirect_uris = os.getenv(
-            "SHAREPOINT_OAUTH_ALLOWED_REDIRECT_URIS"
-        )
 
-        # 検索設定
-        self.default_max_results = int(
-            os.getenv("SHAREPOINT_DEFAULT_MAX_RESULTS", "20")
-        )
-        self.allowed_file_extensions = self._parse_file_extensions(
-            os.getenv("SHAREPOINT_ALLOWED_FILE_EXTENSIONS", "pdf,docx,xlsx,pptx,txt")
-        )
+@lru_cache(maxsize=32)
+def _split_csv(value: str) -> tuple[str, ...]:
+    """カンマ区切り文字列を前後の空白を除いたトークンに分割する（空要素は除外）
 
-        # Excel処理の制限設定
-        self.excel_max_frozen_rows = int(
-            os.getenv("SHAREPOINT_EXCEL_MAX_FROZEN_ROWS", "100")
-        )
-        self.excel_max_data_rows = int(
-            os.getenv("SHAREPOINT_EXCEL_MAX_DATA_ROWS", "10000")
-        )
-        self.excel_max_data_cols = int(
-            os.getenv("SHAREPOINT_EXCEL_MAX_DATA_COLS", "2000")
+    同じ文字列の分割結果はキャッシュされるため、変更されないようタプルで返す。
+    """
+    return tuple(token for token in map(str.strip, value.split(",")) if token)
+
+
+@dataclass(frozen=True, slots=True)
+class OneDriveTarget:
+    """OneDrive検索対象（SHAREPOINT_ONEDRIVE_PATHSの1エントリ）"""
+
+    email: str
+    folder_path: str
+    onedrive_path: str
+
+
+class SharePointConfig:
+    """SharePoint設定クラス
+
+    各設定値は初回アクセス時に環境変数から読み込み、以降はキャッシュする。
+    """
+
+    # SharePoint設定
+    @cached_property
+    def base_url(self) -> str:
+        """SharePointのベースURL（例: https://company.sharepoint.com）"""
+        return os.getenv("SHAREPOINT_BASE_URL", "")
+
+    @cached_property
+    def site_name(self) -> str:
+        """サイト名（オプション）"""
+        return os.getenv("SHAREPOINT_SITE_NAME", "")
+
+    # OneDrive設定
+    @cached_property
+    def onedrive_paths(self) -> str:
+        """OneDriveパス設定（カンマ区切り）"""
+        return os.getenv("SHAREPOINT_ONEDRIVE_PATHS", "")
+
+    @cached_property
+    def tenant_id(self) -> str:
+        """テナントID"""
+        return os.getenv("SHAREPOINT_TENANT_ID", "")
+
+    # 認証モード設定
+    @cached_property
+    def auth_mode(self) -> str:
+        """認証モード（certificate または oauth）"""
+        return os.getenv("SHAREPOINT_AUTH_MODE", "certificate")
+
+    # 証明書認証設定（certificateモード）
+    @cached_property
+    def client_id(self) -> str:
+        """Client ID"""
+        return os.getenv("SHAREPOINT_CLIENT_ID", "")
+
+    @cached_property
+    def certificate_path(self) -> str:
+        """証明書ファイルのパス"""
+        return os.getenv("SHAREPOINT_CERTIFICATE_PATH", "")
+
+    @cached_property
+    def certificate_text(self) -> str:
+        """証明書の内容"""
+        return os.getenv("SHAREPOINT_CERTIFICATE_TEXT", "")
+
+    @cached_property
+    def private_key_path(self) -> str:
+        """秘密鍵ファイルのパス"""
+        return os.getenv("SHAREPOINT_PRIVATE_KEY_PATH", "")
+
+    @cached_property
+    def private_key_text(self) -> str:
+        """秘密鍵の内容"""
+        return os.getenv("SHAREPOINT_PRIVATE_KEY_TEXT", "")
+
+    # OAuth認証設定（oauthモード）
+    @cached_property
+    def _oauth_client_id_env(self) -> str:
+        return os.getenv("SHAREPOINT_OAUTH_CLIENT_ID", "")
+
+    @cached_property
+    def oauth_client_secret(self) -> str:
+        """OAuth用のClient Secret"""
+        return os.getenv("SHAREPOINT_OAUTH_CLIENT_SECRET", "")
+
+    @cached_property
+    def oauth_server_base_url(self) -> str:
+        """OAuthコールバックを受けるMCPサーバーのベースURL"""
+        return os.getenv("SHAREPOINT_OAUTH_SERVER_BASE_URL", "http://localhost:8000")
+
+    @cached_property
+    def oauth_allowed_redirect_uris(self) -> str | None:
+        """許可するリダイレクトURI（カンマ区切り、ワイルドカード対応）
+
+        None = allow all (default for development convenience)
+        """
+        return os.getenv("SHAREPOINT_OAUTH_ALLOWED_REDIRECT_URIS")
+
+    # 検索設定
+    @cached_property
+    def default_max_results(self) -> int:
+        """デフォルトの最大検索結果数"""
+        return int(os.getenv("SHAREPOINT_DEFAULT_MAX_RESULTS", "20"))
+
+    @cached_property
+    def allowed_file_extensions(self) -> list[str]:
+        """検索を許可するファイル拡張子のリスト"""
+        return self._parse_file_extensions(
+            os.getenv("SHAREPOINT_ALLOWED_FILE_EXTENSIONS", "pdf,docx,xlsx,pptx,txt")
         )
 
-        # ツール説明文のカスタマイズ
-        self.search_tool_description = os.getenv(
+    @cached_property
+    def allowed_file_extension_set(self) -> frozenset[str]:
+        """allowed_file_extensionsの集合（小文字化済み、許可判定用）"""
+        return frozenset(self.allowed_file_extensions)
+
+    # Excel処理の制限設定
+    @cached_property
+    def excel_max_frozen_rows(self) -> int:
+        """固定行数の上限"""
+        return int(os.getenv("SHAREPOINT_EXCEL_MAX_FROZEN_ROWS", "100"))
+
+    @cached_property
+    def excel_max_data_rows(self) -> int:
+        """取得するデータ行数の上限"""
+        return int(os.getenv("SHAREPOINT_EXCEL_MAX_DATA_ROWS", "10000"))
+
+    @cached_property
+    def excel_max_data_cols(self) -> int:
+        """取得するデータ列数の上限"""
+        return int(os.getenv("SHAREPOINT_EXCEL_MAX_DATA_COLS", "2000"))
+
+    # ツール説明文のカスタマイズ
+    @cached_property
+    def search_tool_description(self) -> str:
+        """検索ツールの説明文"""
+        return os.getenv(
             "SHAREPOINT_SEARCH_TOOL_DESCRIPTION",
             "Search for documents in SharePoint. Use response_format='compact' for token-efficient results with only title, path, and extension.",
         )
-        self.download_tool_description = os.getenv(
+
+    @cached_property
+    def download_tool_description(self) -> str:
+        """ダウンロードツールの説明文"""
+        return os.getenv(
             "SHAREPOINT_DOWNLOAD_TOOL_DESCRIPTION", "Download a file from SharePoint"
         )
 
-        # 無効化するツールの設定
-        self._disabled_tools_str = os.getenv("SHAREPOINT_DISABLED_TOOLS", "")
+    # 無効化するツールの設定
+    @cached_property
+    def _disabled_tools_str(self) -> str:
+        return os.getenv("SHAREPOINT_DISABLED_TOOLS", "")
 
-    @property
+    @cached_property
     def site_url(self) -> str:
         """サイトURLを取得（サイト名が指定されている場合のみ）"""
         if self.site_name:
             return f"{self.base_url}/sites/{self.site_name}"
         return self.base_url
 
-    @property
+    @cached_property
     def is_site_specific(self) -> bool:
         """特定のサイトに限定されているかどうか"""
         return bool(self.site_name) and not self.has_multiple_targets
 
-    @property
+    @cached_property
+    def _site_tokens(self) -> list[str]:
+        """SHAREPOINT_SITE_NAMEをカンマで分割したトークン（特別キーワードを含む）"""
+        return list(_split_csv(self.site_name))
+
+    @cached_property
+    def _site_token_set(self) -> frozenset[str]:
+        """_site_tokensの集合（特別キーワードの存在判定用）"""
+        return frozenset(self._site_tokens)
+
+    @cached_property
     def has_multiple_targets(self) -> bool:
         """複数サイトまたはOneDriveを含む検索かどうか"""
         if not self.site_name:
             return False
 
         # 特別キーワードを含めた全サイトリストをチェック
-        all_sites = [site.strip() for site in self.site_name.split(",") if site.strip()]
-        return self.include_onedrive or len(self.sites) > 1 or "@all" in all_sites
+        return (
+            self.include_onedrive
+            or len(self._sites) > 1
+            or "@all" in self._site_token_set
+        )
 
-    @property
+    @cached_property
     def include_onedrive(self) -> bool:
         """OneDrive検索が含まれるかどうか"""
         if not self.site_name:
             return False
-        sites_with_keywords = [
-            site.strip() for site in self.site_name.split(",") if site.strip()
-        ]
-        return "@onedrive" in sites_with_keywords and bool(self.onedrive_paths)
+        return "@onedrive" in self._site_token_set and bool(self.onedrive_paths)
 
     @property
     def sites(self) -> list[str]:
         """検索対象サイトのリスト（@onedriveなど特別キーワードを除く）"""
-        if not self.site_name:
-            return []
+        return list(self._sites)
 
-        sites = [site.strip() for site in self.site_name.split(",") if site.strip()]
+    @cached_property
+    def _sites(self) -> tuple[str, ...]:
+        """検索対象サイト（sitesのキャッシュ）"""
         # 特別キーワードを除外
-        return [site for site in sites if not site.startswith("@")]
+        return tuple(site for site in self._site_tokens if not site.startswith("@"))
 
     def _parse_file_extensions(self, extensions_str: str) -> list[str]:
         """ファイル拡張子文字列をリストに変換"""
-        if not extensions_str:
-            return []
-        return [ext.strip().lower() for ext in extensions_str.split(",") if ext.strip()]
+        return [ext.lower() for ext in _split_csv(extensions_str)]
+
+    def parse_onedrive_paths(self) -> list[OneDriveTarget]:
+        """OneDriveパス設定を解析してユーザーとフォルダー情報を返す
+
+        解析結果はキャッシュされ、呼び出しごとにそのコピーを返す。
+        """
+        return list(self._onedrive_targets)
 
-    def parse_onedrive_paths(self) -> list[dict[str, str]]:
-        """OneDriveパス設定を解析してユーザーとフォルダー情報を返す"""
+    @cached_property
+    def _onedrive_targets(self) -> tuple[OneDriveTarget, ...]:
+        """OneDriveパス設定の解析結果（parse_onedrive_pathsのキャッシュ）"""
         if not self.onedrive_paths:
-            return []
+            return ()
 
         result = []
-        entries = [
-            entry.strip() for entry in self.onedrive_paths.split(",") if entry.strip()
-        ]
-
-        for entry in entries:
+        for entry in _split_csv(self.onedrive_paths):
             if ":" in entry:
                 # user@domain.com:/folder/path形式
                 email, folder_path = entry.split(":", 1)
@@ -144,7 +251,7 @@ class SharePointConfig:
                 folder_path = folder_path.strip()
             else:
                 # user@domain.com形式（ユーザー全体）
-                email = entry.strip()
+                email = entry
                 folder_path = ""
 
             # メールアドレス形式の簡易チェック
@@ -154,20 +261,14 @@ class SharePointConfig:
             # OneDriveパスを構築
             onedrive_path = self._email_to_onedrive_path(email, folder_path)
 
-            result.append(
-                {
-                    "email": email,
-                    "folder_path": folder_path,
-                    "onedrive_path": onedrive_path,
-                }
-            )
+            result.append(OneDriveTarget(email, folder_path, onedrive_path))
 
-        return result
+        return tuple(result)
 
     def _email_to_onedrive_path(self, email: str, folder_path: str = "") -> str:
         """メールアドレスをOneDriveパスに変換"""
         # user@company.com → user_company_com
-        onedrive_user = email.replace("@", "_").replace(".", "_")
+        onedrive_user = email.translate(_EMAIL_TO_ONEDRIVE_USER)
 
         # personal/user_company_com[/folder/path]
         onedrive_path = f"personal/{onedrive_user}"
@@ -179,24 +280,24 @@ class SharePointConfig:
 
         return onedrive_path
 
-    def get_onedrive_targets(self) -> list[dict[str, str]]:
+    def get_onedrive_targets(self) -> list[OneDriveTarget]:
         """OneDrive検索対象を取得"""
         if not self.include_onedrive:
             return []
 
         return self.parse_onedrive_paths()
 
-    @property
+    @cached_property
     def is_oauth_mode(self) -> bool:
         """OAuth認証モードかどうか"""
         return self.auth_mode.lower() == "oauth"
 
-    @property
+    @cached_property
     def is_certificate_mode(self) -> bool:
         """証明書認証モードかどうか"""
         return self.auth_mode.lower() == "certificate"
 
-    @property
+    @cached_property
     def oauth_client_id(self) -> str:
         """OAuth用のClient ID（未設定の場合はclient_idにフォールバック）"""
         return self._oauth_client_id_env or self.client_id
@@ -213,14 +314,19 @@ class SharePointConfig:
             return None
         if not self.oauth_allowed_redirect_uris:
             return []
-        return [
-            uri.strip()
-            for uri in self.oauth_allowed_redirect_uris.split(",")
-            if uri.strip()
-        ]
+        return list(_split_csv(self.oauth_allowed_redirect_uris))
 
     def validate(self) -> list[str]:
-        """設定の検証を行い、エラーメッセージのリストを返す"""
+        """設定の検証を行い、エラーメッセージのリストを返す
+
+        設定値は読み込み後に変化しないため、検証結果はキャッシュされ、
+        呼び出しごとにそのコピーを返す。
+        """
+        return list(self.validation_errors)
+
+    @cached_property
+    def validation_errors(self) -> tuple[str, ...]:
+        """設定の検証結果（エラーメッセージのタプル）"""
         errors = []
 
         # 共通検証
@@ -266,27 +372,21 @@ class SharePointConfig:
                 f"Invalid SHAREPOINT_AUTH_MODE: {self.auth_mode} (must be 'certificate' or 'oauth')"
             )
 
-        return errors
+        return tuple(errors)
 
     @property
     def is_valid(self) -> bool:
         """設定が有効かどうかを返す"""
-        return len(self.validate()) == 0
+        return not self.validation_errors
 
-    @property
-    def disabled_tools(self) -> set[str]:
+    @cached_property
+    def disabled_tools(self) -> frozenset[str]:
         """無効化されたツール名のセットを返す
 
         環境変数 SHAREPOINT_DISABLED_TOOLS で指定されたツールのセット。
         有効な値: sharepoint_docs_search, sharepoint_docs_download, sharepoint_excel
         """
-        if not self._disabled_tools_str:
-            return set()
-        return {
-            tool.strip().lower()
-            for tool in self._disabled_tools_str.split(",")
-            if tool.strip()
-        }
+        return frozenset(tool.lower() for tool in _split_csv(self._disabled_tools_str))
 
     def is_tool_enabled(self, tool_name: str) -> bool:
         """指定されたツールが有効かどうかを返す
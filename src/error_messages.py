@@ -3,12 +3,55 @@ Error message definitions for SharePoint Search MCP Server
 Provides natural language error messages that are easy for AI agents to understand
 """
 
-from enum import Enum
+import re
+from collections.abc import Callable
+from enum import StrEnum
+from typing import NamedTuple
+from zipfile import BadZipFile
+
+from openpyxl.utils.exceptions import CellCoordinatesException, InvalidFileException
 
 from src.config import config
 
+# エラーメッセージ内容による分類用のキーワード（大文字小文字は区別しない）
+_AUTHENTICATION_KEYWORDS = ("certificate", "private_key", "jwt", "token", "auth")
+_AUTHORIZATION_KEYWORDS = ("403", "forbidden", "access denied", "permission")
+_NETWORK_KEYWORDS = ("timeout", "connection", "network", "dns")
+_SEARCH_QUERY_KEYWORDS = ("query", "search")
+_NOT_FOUND_KEYWORDS = ("not found", "404")
+_CONFIGURATION_KEYWORDS = ("config", "validation", "missing", "required")
+
+
+def _keyword_pattern(keywords: tuple[str, ...]) -> re.Pattern[str]:
+    """キーワードのいずれかを含むかを1回の走査で判定するパターンを作成する"""
+    return re.compile(
+        "|".join(re.escape(keyword) for keyword in keywords), re.IGNORECASE
+    )
+
+
+_AUTHENTICATION_RE = _keyword_pattern(_AUTHENTICATION_KEYWORDS)
+_AUTHORIZATION_RE = _keyword_pattern(_AUTHORIZATION_KEYWORDS)
+_NETWORK_RE = _keyword_pattern(_NETWORK_KEYWORDS)
+_SEARCH_QUERY_RE = _keyword_pattern(_SEARCH_QUERY_KEYWORDS)
+_NOT_FOUND_RE = _keyword_pattern(_NOT_FOUND_KEYWORDS)
+_CONFIGURATION_RE = _keyword_pattern(_CONFIGURATION_KEYWORDS)
 
-class ErrorCategory(Enum):
+# 各エラーメッセージ生成関数内の分岐用パターン
+_OAUTH_LOGIN_RE = _keyword_pattern(("oauth/login", "no valid access token"))
+_CREDENTIAL_LOAD_RE = _keyword_pattern(("certificate", "private_key"))
+_UNAUTHORIZED_RE = _keyword_pattern(("401", "unauthorized"))
+_TIMEOUT_RE = _keyword_pattern(("timeout",))
+_CONNECTION_RE = _keyword_pattern(("connection",))
+_ALL_DOWNLOADS_FAILED_RE = _keyword_pattern(("all download methods failed",))
+
+# Excel操作のエラー分類用パターン
+_EXCEL_INVALID_FILE_RE = _keyword_pattern(("not a valid", "corrupt"))
+_EXCEL_SHEET_NOT_FOUND_RE = re.compile(
+    r"sheet.*not found|not found.*sheet", re.IGNORECASE | re.DOTALL
+)
+
+
+class ErrorCategory(StrEnum):
     """Error category definitions"""
 
     AUTHENTICATION = "authentication"
@@ -24,9 +67,33 @@ class ErrorCategory(Enum):
     UNKNOWN = "unknown"
 
 
+class _ErrorTemplate(NamedTuple):
+    """Error definition whose message and solution are fixed"""
+
+    category: ErrorCategory
+    message: str
+    solution: str
+    formatted_message: str
+
+
+def _error_template(
+    category: ErrorCategory, message: str, solution: str
+) -> _ErrorTemplate:
+    """固定メッセージのエラー定義を作成する（整形済みメッセージも事前に計算する）"""
+    return _ErrorTemplate(category, message, solution, f"{message} {solution}")
+
+
 class SharePointError(Exception):
     """Custom exception class for SharePoint operations"""
 
+    __slots__ = (
+        "category",
+        "message",
+        "solution",
+        "original_error",
+        "_formatted_message",
+    )
+
     def __init__(
         self,
         category: ErrorCategory,
@@ -38,112 +105,153 @@ class SharePointError(Exception):
         self.message = message
         self.solution = solution
         self.original_error = original_error
-        super().__init__(self.get_formatted_message())
+        self._formatted_message = f"{message} {solution}"
+        super().__init__(self._formatted_message)
+
+    @classmethod
+    def _from_template(
+        cls, template: _ErrorTemplate, original_error: Exception | None = None
+    ) -> "SharePointError":
+        """テンプレートから生成する（整形済みメッセージを再利用し、__init__を経由しない）"""
+        error = cls.__new__(cls)
+        error.category = template.category
+        error.message = template.message
+        error.solution = template.solution
+        error.original_error = original_error
+        error._formatted_message = template.formatted_message
+        Exception.__init__(error, template.formatted_message)
+        return error
 
     def get_formatted_message(self) -> str:
         """Get formatted error message for AI agents"""
-        return f"{self.message} {self.solution}"
+        return self._formatted_message
+
+
+# 複数のエラーで共通の解決策
+_CHECK_CONFIGURATION_SOLUTION = (
+    "Please check your configuration or contact your administrator."
+)
+
+# メッセージと解決策が固定のエラー定義
+_CREDENTIAL_LOAD_ERROR = _error_template(
+    ErrorCategory.AUTHENTICATION,
+    "Failed to load certificate or private key.",
+    "Please verify that the certificate file path and private key file path, or their contents, are correctly configured.",
+)
+_UNAUTHORIZED_ERROR = _error_template(
+    ErrorCategory.AUTHENTICATION,
+    "SharePoint authentication failed.",
+    "Please verify the tenant ID, client ID, and certificate settings, and contact your administrator about the app registration status.",
+)
+_AUTHENTICATION_GENERIC_ERROR = _error_template(
+    ErrorCategory.AUTHENTICATION,
+    "An error occurred during authentication.",
+    _CHECK_CONFIGURATION_SOLUTION,
+)
+_AUTHORIZATION_ERROR = _error_template(
+    ErrorCategory.AUTHORIZATION,
+    "Access to SharePoint was denied.",
+    "Please check the app permissions or request SharePoint site access from your administrator.",
+)
+_NETWORK_TIMEOUT_ERROR = _error_template(
+    ErrorCategory.NETWORK,
+    "Connection to SharePoint server timed out.",
+    "Please check your network connection or try again after a few moments.",
+)
+_NETWORK_CONNECTION_ERROR = _error_template(
+    ErrorCategory.NETWORK,
+    "Could not connect to SharePoint server.",
+    "Please verify your internet connection and site URL.",
+)
+_NETWORK_GENERIC_ERROR = _error_template(
+    ErrorCategory.NETWORK,
+    "A network communication error occurred.",
+    "Please check your network connection and try again.",
+)
+_SEARCH_QUERY_ERROR = _error_template(
+    ErrorCategory.SEARCH_QUERY,
+    "An error occurred while processing the search query.",
+    "Please try different search keywords or specify more specific search criteria.",
+)
+_CONFIGURATION_ERROR = _error_template(
+    ErrorCategory.CONFIGURATION,
+    "There is a problem with the SharePoint configuration.",
+    "Please check the environment variable settings and ensure all required configuration items are correctly set.",
+)
+_EXCEL_INVALID_FILE_ERROR = _error_template(
+    ErrorCategory.EXCEL_INVALID_FILE,
+    "The file is not a valid Excel file or is corrupted.",
+    "Please verify the file is a valid .xlsx file. Try opening it in Excel locally to check for corruption, or re-upload the file to SharePoint.",
+)
+_UNKNOWN_ERROR = _error_template(
+    ErrorCategory.UNKNOWN,
+    "An unexpected error occurred.",
+    _CHECK_CONFIGURATION_SOLUTION,
+)
+
+
+def _oauth_login_required_error() -> _ErrorTemplate:
+    """OAuth未認証エラーの定義（ログインURLは呼び出し時の設定から組み立てる）"""
+    login_url = f"{config.oauth_server_base_url.rstrip('/')}/auth/login"
+    return _error_template(
+        ErrorCategory.AUTHENTICATION,
+        "OAuth authentication required but not completed.",
+        f"Please visit {login_url} to authenticate with your Microsoft account. After successful authentication, tokens will be cached and you can retry this operation.",
+    )
 
 
 def get_authentication_error(original_error: Exception) -> SharePointError:
     """Generate authentication error message"""
-    error_str = str(original_error).lower()
-
-    if "oauth/login" in error_str or "no valid access token" in error_str:
-        login_url = f"{config.oauth_server_base_url.rstrip('/')}/auth/login"
-        return SharePointError(
-            category=ErrorCategory.AUTHENTICATION,
-            message="OAuth authentication required but not completed.",
-            solution=f"Please visit {login_url} to authenticate with your Microsoft account. After successful authentication, tokens will be cached and you can retry this operation.",
-            original_error=original_error,
-        )
-    elif "certificate" in error_str or "private_key" in error_str:
-        return SharePointError(
-            category=ErrorCategory.AUTHENTICATION,
-            message="Failed to load certificate or private key.",
-            solution="Please verify that the certificate file path and private key file path, or their contents, are correctly configured.",
-            original_error=original_error,
-        )
-    elif "401" in error_str or "unauthorized" in error_str:
-        return SharePointError(
-            category=ErrorCategory.AUTHENTICATION,
-            message="SharePoint authentication failed.",
-            solution="Please verify the tenant ID, client ID, and certificate settings, and contact your administrator about the app registration status.",
-            original_error=original_error,
-        )
+    error_str = str(original_error)
+
+    if _OAUTH_LOGIN_RE.search(error_str):
+        template = _oauth_login_required_error()
+    elif _CREDENTIAL_LOAD_RE.search(error_str):
+        template = _CREDENTIAL_LOAD_ERROR
+    elif _UNAUTHORIZED_RE.search(error_str):
+        template = _UNAUTHORIZED_ERROR
     else:
-        return SharePointError(
-            category=ErrorCategory.AUTHENTICATION,
-            message="An error occurred during authentication.",
-            solution="Please check your configuration or contact your administrator.",
-            original_error=original_error,
-        )
+        template = _AUTHENTICATION_GENERIC_ERROR
+    return SharePointError._from_template(template, original_error)
 
 
 def get_authorization_error(original_error: Exception) -> SharePointError:
     """Generate authorization error message"""
-    return SharePointError(
-        category=ErrorCategory.AUTHORIZATION,
-        message="Access to SharePoint was denied.",
-        solution="Please check the app permissions or request SharePoint site access from your administrator.",
-        original_error=original_error,
-    )
+    return SharePointError._from_template(_AUTHORIZATION_ERROR, original_error)
 
 
 def get_network_error(original_error: Exception) -> SharePointError:
     """Generate network error message"""
-    error_str = str(original_error).lower()
-
-    if "timeout" in error_str:
-        return SharePointError(
-            category=ErrorCategory.NETWORK,
-            message="Connection to SharePoint server timed out.",
-            solution="Please check your network connection or try again after a few moments.",
-            original_error=original_error,
-        )
-    elif "connection" in error_str:
-        return SharePointError(
-            category=ErrorCategory.NETWORK,
-            message="Could not connect to SharePoint server.",
-            solution="Please verify your internet connection and site URL.",
-            original_error=original_error,
-        )
+    error_str = str(original_error)
+
+    if _TIMEOUT_RE.search(error_str):
+        template = _NETWORK_TIMEOUT_ERROR
+    elif _CONNECTION_RE.search(error_str):
+        template = _NETWORK_CONNECTION_ERROR
     else:
-        return SharePointError(
-            category=ErrorCategory.NETWORK,
-            message="A network communication error occurred.",
-            solution="Please check your network connection and try again.",
-            original_error=original_error,
-        )
+        template = _NETWORK_GENERIC_ERROR
+    return SharePointError._from_template(template, original_error)
 
 
 def get_search_query_error(original_error: Exception) -> SharePointError:
     """Generate search query error message"""
-    return SharePointError(
-        category=ErrorCategory.SEARCH_QUERY,
-        message="An error occurred while processing the search query.",
-        solution="Please try different search keywords or specify more specific search criteria.",
-        original_error=original_error,
-    )
+    return SharePointError._from_template(_SEARCH_QUERY_ERROR, original_error)
 
 
 def get_file_not_found_error(
     file_path: str | None, original_error: Exception, is_onedrive_file: bool = False
 ) -> SharePointError:
     """Generate file not found error message"""
+    onedrive_note = " This appears to be a OneDrive file." if is_onedrive_file else ""
     if file_path:
-        message = f"The specified file was not found: {file_path}"
+        message = f"The specified file was not found: {file_path}{onedrive_note}"
     else:
-        message = "The requested file was not found."
-
-    if is_onedrive_file:
-        message += " This appears to be a OneDrive file."
+        message = f"The requested file was not found.{onedrive_note}"
 
     # OneDriveファイルの場合は特別なメッセージを提供
-    error_str = str(original_error).lower()
     if is_onedrive_file:
         solution = "This appears to be a OneDrive personal file. The system tried multiple download methods including GetFileByServerRelativePath and GetFileByServerRelativeUrl. Please verify the file still exists and you have access permissions."
-    elif "all download methods failed" in error_str:
+    elif _ALL_DOWNLOADS_FAILED_RE.search(str(original_error)):
         solution = "Multiple download methods were attempted but all failed. This could be due to special characters in the filename, permission issues, or the file being moved. Please try searching for the file again to get an updated path."
     else:
         solution = "Please verify the file path is correct or obtain the correct path from the latest search results."
@@ -158,12 +266,7 @@ def get_file_not_found_error(
 
 def get_configuration_error(original_error: Exception) -> SharePointError:
     """Generate configuration error message"""
-    return SharePointError(
-        category=ErrorCategory.CONFIGURATION,
-        message="There is a problem with the SharePoint configuration.",
-        solution="Please check the environment variable settings and ensure all required configuration items are correctly set.",
-        original_error=original_error,
-    )
+    return SharePointError._from_template(_CONFIGURATION_ERROR, original_error)
 
 
 def get_excel_file_not_found_error(
@@ -204,22 +307,38 @@ def get_excel_invalid_range_error(
 
 def get_excel_invalid_file_error(original_error: Exception) -> SharePointError:
     """Generate Excel invalid file error message"""
-    return SharePointError(
-        category=ErrorCategory.EXCEL_INVALID_FILE,
-        message="The file is not a valid Excel file or is corrupted.",
-        solution="Please verify the file is a valid .xlsx file. Try opening it in Excel locally to check for corruption, or re-upload the file to SharePoint.",
-        original_error=original_error,
-    )
+    return SharePointError._from_template(_EXCEL_INVALID_FILE_ERROR, original_error)
 
 
 def get_unknown_error(original_error: Exception) -> SharePointError:
     """Generate unknown error message"""
-    return SharePointError(
-        category=ErrorCategory.UNKNOWN,
-        message="An unexpected error occurred.",
-        solution="Please check your configuration or contact your administrator.",
-        original_error=original_error,
-    )
+    return SharePointError._from_template(_UNKNOWN_ERROR, original_error)
+
+
+# HTTPステータスコードによる分類のハンドラ（引数はエラーとOneDriveファイルかどうか）
+# キーは (context, status_code)。context が "" のものはすべてのコンテキストに適用する
+_STATUS_CODE_HANDLERS: dict[
+    tuple[str, int], Callable[[Exception, bool], SharePointError]
+] = {
+    ("", 401): lambda error, _: get_authentication_error(error),
+    ("", 403): lambda error, _: get_authorization_error(error),
+    ("download", 404): lambda error, is_onedrive_file: get_file_not_found_error(
+        None, error, is_onedrive_file
+    ),
+}
+
+# エラーメッセージ内容による分類ルール（上から順に評価し、最初に一致したものを使う）
+# 各要素は (context, パターン, ハンドラ)。context が "" のものはすべてのコンテキストに適用する
+_MESSAGE_RULES: tuple[
+    tuple[str, re.Pattern[str], Callable[[Exception], SharePointError]], ...
+] = (
+    ("", _AUTHENTICATION_RE, get_authentication_error),
+    ("", _AUTHORIZATION_RE, get_authorization_error),
+    ("", _NETWORK_RE, get_network_error),
+    ("search", _SEARCH_QUERY_RE, get_search_query_error),
+    ("download", _NOT_FOUND_RE, lambda error: get_file_not_found_error(None, error)),
+    ("", _CONFIGURATION_RE, get_configuration_error),
+)
 
 
 def handle_sharepoint_error(
@@ -244,77 +363,51 @@ def handle_sharepoint_error(
     if isinstance(error, SharePointError):
         return error
 
-    error_str = str(error).lower()
-    error_type_name = type(error).__name__.lower()
+    # エラーメッセージの文字列化はステータスコードで分類できなかった場合まで遅らせる
+    error_str: str | None = None
+
+    response = getattr(error, "response", None)
+    status_code = getattr(response, "status_code", None)
 
     # Excel操作のエラー分類（openpyxlベース）
-    if context.startswith("excel_") or context == "excel_parse":
+    if context.startswith("excel_"):
+        error_str = str(error)
+
         # ファイル形式エラー（zipfile.BadZipFile, openpyxl例外など）を先に判定
         # "invalid" を含むファイル形式エラーを先に処理
-        if (
-            "badzip" in error_type_name
-            or "not a valid" in error_str
-            or "corrupt" in error_str
-        ):
+        if isinstance(
+            error, (BadZipFile, InvalidFileException)
+        ) or _EXCEL_INVALID_FILE_RE.search(error_str):
             return get_excel_invalid_file_error(error)
 
         # ValueErrorはシート名が見つからない場合
         if isinstance(error, ValueError):
-            if "not found" in error_str and "sheet" in error_str:
+            if _EXCEL_SHEET_NOT_FOUND_RE.search(error_str):
                 sheet_name = excel_context.get("sheet_name") if excel_context else None
                 return get_excel_sheet_not_found_error(sheet_name or "unknown", error)
 
-        # openpyxlの無効な座標例外（"coordinate" を明示的にチェック）
-        if "coordinate" in error_type_name:
+        # openpyxlの無効な座標例外
+        if isinstance(error, CellCoordinatesException):
             range_spec = excel_context.get("range_spec") if excel_context else None
             return get_excel_invalid_range_error(range_spec or "unknown", error)
 
         # HTTP 404エラー（ファイルが見つからない）
-        if hasattr(error, "response") and hasattr(error.response, "status_code"):
-            status_code = error.response.status_code
-            if status_code == 404:
-                file_path = excel_context.get("file_path") if excel_context else ""
-                return get_excel_file_not_found_error(file_path or "", error)
+        if status_code == 404:
+            file_path = excel_context.get("file_path") if excel_context else ""
+            return get_excel_file_not_found_error(file_path or "", error)
 
     # Classification by HTTP status code
-    if hasattr(error, "response") and hasattr(error.response, "status_code"):
-        status_code = error.response.status_code
-        if status_code == 401:
-            return get_authentication_error(error)
-        elif status_code == 403:
-            return get_authorization_error(error)
-        elif status_code == 404 and context == "download":
-            return get_file_not_found_error(None, error, is_onedrive_file)
+    if status_code is not None:
+        status_handler = _STATUS_CODE_HANDLERS.get(
+            (context, status_code)
+        ) or _STATUS_CODE_HANDLERS.get(("", status_code))
+        if status_handler is not None:
+            return status_handler(error, is_onedrive_file)
 
     # Classification by error message content
-    if any(
-        keyword in error_str
-        for keyword in ["certificate", "private_key", "jwt", "token", "auth"]
-    ):
-        return get_authentication_error(error)
-    elif any(
-        keyword in error_str
-        for keyword in ["403", "forbidden", "access denied", "permission"]
-    ):
-        return get_authorization_error(error)
-    elif any(
-        keyword in error_str for keyword in ["timeout", "connection", "network", "dns"]
-    ):
-        return get_network_error(error)
-    elif (
-        any(keyword in error_str for keyword in ["query", "search"])
-        and context == "search"
-    ):
-        return get_search_query_error(error)
-    elif (
-        any(keyword in error_str for keyword in ["not found", "404"])
-        and context == "download"
-    ):
-        return get_file_not_found_error(None, error)
-    elif any(
-        keyword in error_str
-        for keyword in ["config", "validation", "missing", "required"]
-    ):
-        return get_configuration_error(error)
-    else:
-        return get_unknown_error(error)
+    if error_str is None:
+        error_str = str(error)
+    for rule_context, pattern, handler in _MESSAGE_RULES:
+        if rule_context in ("", context) and pattern.search(error_str):
+            return handler(error)
+    return get_unknown_error(error)
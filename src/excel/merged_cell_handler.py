@@ -7,7 +7,8 @@ Excelマージセル処理ユーティリティ
 from typing import Any
 
 from openpyxl.utils import column_index_from_string, get_column_letter
-from openpyxl.utils.cell import coordinate_from_string
+
+from src.excel.range_calculator import NO_DOLLAR_TABLE, ExcelRangeCalculator
 
 
 class ExcelMergedCellHandler:
@@ -38,55 +39,62 @@ class ExcelMergedCellHandler:
         """
         merged_ranges: list[dict[str, Any]] = []
 
-        # 今回返す予定の範囲（結合情報の部分展開に使用）
-        # effective_cell_rangeがあればそれを使用、なければsheet.dimensionsを使用
-        planned_range_for_merge = effective_cell_range or (
-            str(sheet.dimensions) if sheet.dimensions else None
-        )
-
-        if not sheet.merged_cells.ranges or not planned_range_for_merge:
+        if not sheet.merged_cells.ranges:
             return (None, None, [])
 
-        # planned_range_for_merge から対象範囲の境界を計算
-        if ":" in planned_range_for_merge:
-            start_cell, end_cell = planned_range_for_merge.split(":", 1)
+        # 今回返す予定の範囲（結合情報の部分展開に使用）
+        # effective_cell_rangeがあればそれを解析し、なければシートの使用範囲
+        # （sheet.dimensionsと同じ境界）を整数のまま使う
+        if effective_cell_range:
+            planned_range = effective_cell_range.translate(NO_DOLLAR_TABLE)
+            start_cell, _, end_cell = planned_range.partition(":")
+            end_cell = end_cell or start_cell
+
+            start_col, start_row = ExcelRangeCalculator.parse_coordinate(start_cell)
+            end_col, end_row = ExcelRangeCalculator.parse_coordinate(end_cell)
+
+            start_col_idx = column_index_from_string(start_col)
+            end_col_idx = column_index_from_string(end_col)
+
+            target_min_row = min(start_row, end_row)
+            target_max_row = max(start_row, end_row)
+            target_min_col = min(start_col_idx, end_col_idx)
+            target_max_col = max(start_col_idx, end_col_idx)
         else:
-            start_cell = planned_range_for_merge
-            end_cell = planned_range_for_merge
-
-        start_cell = start_cell.replace("$", "")
-        end_cell = end_cell.replace("$", "")
-
-        start_col, start_row = coordinate_from_string(start_cell)
-        end_col, end_row = coordinate_from_string(end_cell)
-
-        start_col_idx = column_index_from_string(start_col)
-        end_col_idx = column_index_from_string(end_col)
-
-        target_min_row = min(start_row, end_row)
-        target_max_row = max(start_row, end_row)
-        target_min_col = min(start_col_idx, end_col_idx)
-        target_max_col = max(start_col_idx, end_col_idx)
+            target_min_row = sheet.min_row
+            target_max_row = sheet.max_row
+            target_min_col = sheet.min_column
+            target_max_col = sheet.max_column
 
         merged_cell_map: dict[str, str] = {}
         merged_anchor_value_map: dict[str, Any] = {}
 
-        for merged_range in sheet.merged_cells.ranges:
+        # 返す予定の範囲と交差しない結合は、文字列化などを行う前に除外（部分展開）
+        intersecting_ranges = [
+            merged_range
+            for merged_range in sheet.merged_cells.ranges
+            if merged_range.min_row <= target_max_row
+            and merged_range.max_row >= target_min_row
+            and merged_range.min_col <= target_max_col
+            and merged_range.max_col >= target_min_col
+        ]
+        if not intersecting_ranges:
+            return (None, None, [])
+
+        for merged_range in intersecting_ranges:
             merged_range_str = str(merged_range)
-            range_start = merged_range_str.split(":")[0]
+            range_start = merged_range_str.partition(":")[0]
 
             merged_min_row = merged_range.min_row
             merged_max_row = merged_range.max_row
             merged_min_col = merged_range.min_col
             merged_max_col = merged_range.max_col
 
-            # 返す予定の範囲と交差しない結合は無視（部分展開）
+            # 返す予定の範囲との交差部分
             inter_min_row = max(merged_min_row, target_min_row)
             inter_max_row = min(merged_max_row, target_max_row)
             inter_min_col = max(merged_min_col, target_min_col)
             inter_max_col = min(merged_max_col, target_max_col)
-            if inter_min_row > inter_max_row or inter_min_col > inter_max_col:
-                continue
 
             # アンカー値を決定（左上が空なら結合範囲内の実在セルだけ走査）
             anchor_coord = range_start
@@ -105,10 +113,21 @@ class ExcelMergedCellHandler:
                 )
 
             # セル座標 -> 結合範囲 のマップ（返す予定の範囲と交差する部分だけ展開）
-            for row_idx in range(inter_min_row, inter_max_row + 1):
-                for col_idx in range(inter_min_col, inter_max_col + 1):
-                    coord_str = f"{get_column_letter(col_idx)}{row_idx}"
-                    merged_cell_map[coord_str] = merged_range_str
+            # 列文字は行ごとに変わらないため、先に1回だけ求めておく
+            col_letters = [
+                get_column_letter(col_idx)
+                for col_idx in range(inter_min_col, inter_max_col + 1)
+            ]
+            merged_cell_map.update(
+                dict.fromkeys(
+                    (
+                        f"{col_letter}{row_idx}"
+                        for row_idx in range(inter_min_row, inter_max_row + 1)
+                        for col_letter in col_letters
+                    ),
+                    merged_range_str,
+                )
+            )
 
             # アンカー値を保存（結合セルの値埋め用）
             merged_anchor_value_map[merged_range_str] = anchor_value
@@ -121,9 +140,6 @@ class ExcelMergedCellHandler:
                 }
             )
 
-        if not merged_ranges:
-            return (None, None, [])
-
         return (merged_cell_map, merged_anchor_value_map, merged_ranges)
 
     @staticmethod
@@ -149,43 +165,37 @@ class ExcelMergedCellHandler:
         Returns:
             (anchor_coord, anchor_value)のタプル
         """
-        best_rc: tuple[int, int] | None = None
-        best_val: Any | None = None
-
         # 実在セル（sheet._cells）だけから、結合範囲内の最小(row,col)の値を選ぶ
+        # 行優先（row, col の昇順）で調べ、最初に見つかった非空値で打ち切る
         # 互換性のため_cellsの有無をチェックしてフォールバック
         # 注意: _cellsはopenpyxlのプライベート属性のため、将来のバージョンで変更される可能性があります。
         # その場合は公開APIを使用するフォールバックロジックが動作します。
         if hasattr(sheet, "_cells"):
             # プライベート属性を使った高速版
-            for (r, c), cell_obj in sheet._cells.items():
-                if (
-                    merged_min_row <= r <= merged_max_row
-                    and merged_min_col <= c <= merged_max_col
-                ):
-                    cell_value = value_serializer(cell_obj.value)
-                    if cell_value is not None:
-                        if best_rc is None or (r, c) < best_rc:
-                            best_rc = (r, c)
-                            best_val = cell_value
+            cells = sheet._cells
+            in_merge = sorted(
+                (r, c)
+                for r, c in cells
+                if merged_min_row <= r <= merged_max_row
+                and merged_min_col <= c <= merged_max_col
+            )
+            for r, c in in_merge:
+                cell_value = value_serializer(cells[(r, c)].value)
+                if cell_value is not None:
+                    return (f"{get_column_letter(c)}{r}", cell_value)
         else:
             # 公開APIを使ったフォールバック版
+            col_letters = [
+                get_column_letter(col_idx)
+                for col_idx in range(merged_min_col, merged_max_col + 1)
+            ]
             for row_idx in range(merged_min_row, merged_max_row + 1):
-                for col_idx in range(merged_min_col, merged_max_col + 1):
-                    coord = f"{get_column_letter(col_idx)}{row_idx}"
-                    cell = sheet[coord]
-                    cell_value = value_serializer(cell.value)
+                for col_letter in col_letters:
+                    coord = f"{col_letter}{row_idx}"
+                    cell_value = value_serializer(sheet[coord].value)
                     if cell_value is not None:
-                        if best_rc is None or (row_idx, col_idx) < best_rc:
-                            best_rc = (row_idx, col_idx)
-                            best_val = cell_value
-
-        # アンカー座標とアンカー値を返す
-        if best_rc is not None:
-            r, c = best_rc
-            anchor_coord = f"{get_column_letter(c)}{r}"
-            return (anchor_coord, best_val)
-        else:
-            # 全てのセルが空の場合は最初のセルを返す
-            anchor_coord = f"{get_column_letter(merged_min_col)}{merged_min_row}"
-            return (anchor_coord, None)
+                        return (coord, cell_value)
+
+        # 全てのセルが空の場合は最初のセルを返す
+        anchor_coord = f"{get_column_letter(merged_min_col)}{merged_min_row}"
+        return (anchor_coord, None)
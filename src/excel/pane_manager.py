@@ -28,16 +28,14 @@ class ExcelPaneManager:
         Returns:
             (frozen_rows, frozen_cols)のタプル
         """
+        # sheet_view / pane が無い場合は固定なし
+        pane = getattr(getattr(sheet, "sheet_view", None), "pane", None)
+        if pane is None or pane.state not in ("frozen", "frozenSplit"):
+            return (0, 0)
+
         try:
-            pane = sheet.sheet_view.pane
-            if pane is None:
-                return (0, 0)
-            if pane.state not in ("frozen", "frozenSplit"):
-                return (0, 0)
-            frozen_rows = int(pane.ySplit) if pane.ySplit else 0
-            frozen_cols = int(pane.xSplit) if pane.xSplit else 0
-            return (frozen_rows, frozen_cols)
-        except Exception as e:
+            return (int(pane.ySplit or 0), int(pane.xSplit or 0))
+        except (TypeError, ValueError) as e:
             logger.warning(f"Failed to get frozen panes info: {e}")
             return (0, 0)
 
@@ -5,17 +5,46 @@ Excel範囲計算ユーティリティ
 """
 
 import logging
+import re
+from functools import lru_cache
 
 from openpyxl.utils import column_index_from_string, get_column_letter
 from openpyxl.utils.cell import coordinate_from_string
 
 logger = logging.getLogger(__name__)
 
+# セル参照から絶対参照記号"$"を取り除く変換テーブル
+NO_DOLLAR_TABLE = str.maketrans("", "", "$")
+
+# 列のみ指定（例: "J", "$J", "J:K", "$J:$K"）を1回で判定する正規表現
+_COL_ONLY_RE = re.compile(r"\$?([A-Za-z]+)(?::\$?([A-Za-z]+))?")
+
 
 class ExcelRangeCalculator:
     """セル範囲の計算・変換・検証（全て staticmethod）"""
 
     @staticmethod
+    @lru_cache(maxsize=4096)
+    def parse_coordinate(coord: str) -> tuple[str, int]:
+        """
+        セル座標を列文字と行番号に分解する（結果はキャッシュ）
+
+        同じ範囲の端点は1回のリクエスト内で何度も解析されるため、
+        openpyxlのcoordinate_from_stringの結果を座標文字列ごとに再利用する。
+
+        Args:
+            coord: セル座標（例: "B12", "$B$12"）
+
+        Returns:
+            (列文字, 行番号)のタプル（例: ("B", 12)）
+
+        Raises:
+            CellCoordinatesException: 座標として解釈できない場合
+        """
+        return coordinate_from_string(coord)
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
     def calculate_header_range(cell_range: str, frozen_rows: int) -> str | None:
         """
         セル範囲に対してfrozen_rowsに基づくヘッダー範囲を計算
@@ -49,8 +78,8 @@ class ExcelRangeCalculator:
             start = end = cell_range
 
         # 開始セルの座標を解析
-        start_col_letter, start_row = coordinate_from_string(start)
-        end_col_letter, _ = coordinate_from_string(end)
+        start_col_letter, start_row = ExcelRangeCalculator.parse_coordinate(start)
+        end_col_letter, _ = ExcelRangeCalculator.parse_coordinate(end)
 
         # 既に1行目から開始している場合は追加不要（ヘッダー全体を含む）
         if start_row == 1:
@@ -78,43 +107,44 @@ class ExcelRangeCalculator:
         Returns:
             結合された範囲（例: "A1:B6"）
         """
-        # 範囲1を解析
-        if ":" in range1:
-            start1, end1 = range1.split(":")
-        else:
-            start1 = end1 = range1
-
-        # 範囲2を解析
-        if ":" in range2:
-            start2, end2 = range2.split(":")
-        else:
-            start2 = end2 = range2
-
-        # 座標を取得
-        col1_start, row1_start = coordinate_from_string(start1)
-        col1_end, row1_end = coordinate_from_string(end1)
-        col2_start, row2_start = coordinate_from_string(start2)
-        col2_end, row2_end = coordinate_from_string(end2)
-
-        # 最小/最大の列を決定
-        col_start_idx = min(
-            column_index_from_string(col1_start), column_index_from_string(col2_start)
+        start_col1, start_row1, end_col1, end_row1 = (
+            ExcelRangeCalculator._range_endpoints(range1)
         )
-        col_end_idx = max(
-            column_index_from_string(col1_end), column_index_from_string(col2_end)
+        start_col2, start_row2, end_col2, end_row2 = (
+            ExcelRangeCalculator._range_endpoints(range2)
         )
 
-        # 最小/最大の行を決定
-        row_start = min(row1_start, row2_start)
-        row_end = max(row1_end, row2_end)
-
-        # 列インデックスを文字に変換
-        col_start = get_column_letter(col_start_idx)
-        col_end = get_column_letter(col_end_idx)
+        # 最小/最大の列・行を決定し、列インデックスは最後に1回だけ文字へ変換
+        col_start = get_column_letter(min(start_col1, start_col2))
+        col_end = get_column_letter(max(end_col1, end_col2))
+        row_start = min(start_row1, start_row2)
+        row_end = max(end_row1, end_row2)
 
         return f"{col_start}{row_start}:{col_end}{row_end}"
 
     @staticmethod
+    def _range_endpoints(range_str: str) -> tuple[int, int, int, int]:
+        """
+        セル範囲の始点・終点を整数の列インデックスと行番号に分解する
+
+        Args:
+            range_str: セル範囲（例: "A1:B2"）または単一セル（例: "A1"）
+
+        Returns:
+            (始点列, 始点行, 終点列, 終点行)のタプル
+        """
+        start, _, end = range_str.partition(":")
+        start_col, start_row = ExcelRangeCalculator.parse_coordinate(start)
+        end_col, end_row = ExcelRangeCalculator.parse_coordinate(end or start)
+        return (
+            column_index_from_string(start_col),
+            start_row,
+            column_index_from_string(end_col),
+            end_row,
+        )
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
     def expand_axis_range(range_str: str) -> str:
         """
         単一セル・列・行を1行目/A列まで拡張する
@@ -135,19 +165,16 @@ class ExcelRangeCalculator:
             return range_str
 
         raw = range_str.strip()
-        if ":" not in raw:
+        start_cell, sep, end_cell = raw.translate(NO_DOLLAR_TABLE).partition(":")
+        if not sep:
             try:
-                col, row = coordinate_from_string(raw.replace("$", ""))
+                col, row = ExcelRangeCalculator.parse_coordinate(start_cell)
                 return f"{col}1:{col}{row}"
             except ValueError:
                 return range_str
 
-        start_cell, end_cell = raw.split(":", 1)
-        start_cell = start_cell.replace("$", "")
-        end_cell = end_cell.replace("$", "")
-
-        start_col, start_row = coordinate_from_string(start_cell)
-        end_col, end_row = coordinate_from_string(end_cell)
+        start_col, start_row = ExcelRangeCalculator.parse_coordinate(start_cell)
+        end_col, end_row = ExcelRangeCalculator.parse_coordinate(end_cell)
 
         # 列指定（同一列）: 逆順はそのまま（既存のrange検証で弾く）
         if start_col == end_col:
@@ -176,32 +203,43 @@ class ExcelRangeCalculator:
             エラー時は (0, 0) を返す。
         """
         try:
-            if ":" not in range_str:
-                # 単一セルの場合
-                return (1, 1)
+            return ExcelRangeCalculator._parse_range_size(range_str)
+        except Exception as e:
+            # 元の実装との互換性維持: エラー時は (0, 0) を返す
+            logger.warning("Failed to calculate range size '%s': %s", range_str, e)
+            return (0, 0)
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _parse_range_size(range_str: str) -> tuple[int, int]:
+        """
+        calculate_range_sizeの本体（解析に成功した結果のみキャッシュ）
+
+        Raises:
+            ValueError: 座標として解釈できない場合、または逆順序の範囲の場合
+        """
+        if ":" not in range_str:
+            # 単一セルの場合
+            return (1, 1)
 
-            start_cell, end_cell = range_str.split(":")
-            start_col, start_row = coordinate_from_string(start_cell)
-            end_col, end_row = coordinate_from_string(end_cell)
+        start_cell, end_cell = range_str.split(":")
+        start_col, start_row = ExcelRangeCalculator.parse_coordinate(start_cell)
+        end_col, end_row = ExcelRangeCalculator.parse_coordinate(end_cell)
 
-            start_col_idx = column_index_from_string(start_col)
-            end_col_idx = column_index_from_string(end_col)
+        start_col_idx = column_index_from_string(start_col)
+        end_col_idx = column_index_from_string(end_col)
 
-            # 逆順序の範囲を検出（セキュリティ対策）
-            if end_row < start_row or end_col_idx < start_col_idx:
-                raise ValueError(
-                    f"無効なセル範囲: '{range_str}'。"
-                    f"範囲は正しい順序で指定してください（例: 'A1:Z100'）"
-                )
+        # 逆順序の範囲を検出（セキュリティ対策）
+        if end_row < start_row or end_col_idx < start_col_idx:
+            raise ValueError(
+                f"無効なセル範囲: '{range_str}'。"
+                f"範囲は正しい順序で指定してください（例: 'A1:Z100'）"
+            )
 
-            rows = end_row - start_row + 1
-            cols = end_col_idx - start_col_idx + 1
+        rows = end_row - start_row + 1
+        cols = end_col_idx - start_col_idx + 1
 
-            return (rows, cols)
-        except Exception as e:
-            # 元の実装との互換性維持: エラー時は (0, 0) を返す
-            logger.warning(f"Failed to calculate range size '{range_str}': {e}")
-            return (0, 0)
+        return (rows, cols)
 
     @staticmethod
     def normalize_column_range(cell_range: str, max_row: int) -> str:
@@ -218,32 +256,17 @@ class ExcelRangeCalculator:
         Raises:
             ValueError: 逆順序の列範囲を検出した場合
         """
-        raw = cell_range.strip()
-        if not raw:
+        # "J:J" / "$J:$K" のような列範囲、または "J" のような単一列指定
+        match = _COL_ONLY_RE.fullmatch(cell_range.strip())
+        if not match:
             return cell_range
 
-        # "J:J" のような列のみ指定
-        if ":" in raw:
-            start, end = raw.split(":", 1)
-            start_col = start.replace("$", "")
-            end_col = end.replace("$", "")
-            if start_col.isalpha() and end_col.isalpha():
-                start_col = start_col.upper()
-                end_col = end_col.upper()
-                # 逆順序の列を検出
-                if column_index_from_string(end_col) < column_index_from_string(
-                    start_col
-                ):
-                    raise ValueError(
-                        f"無効なセル範囲: '{cell_range}'。"
-                        f"範囲は正しい順序で指定してください（例: 'A1:Z100'）"
-                    )
-                return f"{start_col}1:{end_col}{max_row}"
-
-        # "J" のような単一列指定
-        col_only = raw.replace("$", "")
-        if col_only.isalpha():
-            col_only = col_only.upper()
-            return f"{col_only}1:{col_only}{max_row}"
-
-        return cell_range
+        start_col = match.group(1).upper()
+        end_col = (match.group(2) or start_col).upper()
+        # 逆順序の列を検出
+        if column_index_from_string(end_col) < column_index_from_string(start_col):
+            raise ValueError(
+                f"無効なセル範囲: '{cell_range}'。"
+                f"範囲は正しい順序で指定してください（例: 'A1:Z100'）"
+            )
+        return f"{start_col}1:{end_col}{max_row}"
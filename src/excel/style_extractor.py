@@ -6,6 +6,7 @@ Excelスタイル抽出ユーティリティ
 
 from typing import Any
 
+from openpyxl.cell.cell import MergedCell
 from openpyxl.styles import Color
 
 
@@ -38,6 +39,28 @@ class ExcelStyleExtractor:
 
         return None
 
+    @staticmethod
+    def _build_fill_info(fill) -> dict[str, Any]:
+        """
+        塗りつぶしスタイルから背景色情報を作成
+
+        Args:
+            fill: openpyxl Fill（patternTypeが設定済みのもの）
+
+        Returns:
+            背景色情報のdict（pattern_type, fg_color, bg_color）
+        """
+        fill_info: dict[str, Any] = {
+            "pattern_type": fill.patternType,
+        }
+        fg_color = ExcelStyleExtractor.color_to_hex(fill.fgColor)
+        if fg_color:
+            fill_info["fg_color"] = fg_color
+        bg_color = ExcelStyleExtractor.color_to_hex(fill.bgColor)
+        if bg_color:
+            fill_info["bg_color"] = bg_color
+        return fill_info
+
     @staticmethod
     def build_cell_size_cache(sheet) -> tuple[dict[str, float], dict[int, float]]:
         """
@@ -51,16 +74,16 @@ class ExcelStyleExtractor:
             - col_widths: 列文字 -> 幅のマップ
             - row_heights: 行番号 -> 高さのマップ
         """
-        col_widths: dict[str, float] = {}
-        row_heights: dict[int, float] = {}
-
-        for col_letter, dim in sheet.column_dimensions.items():
-            if dim.width:
-                col_widths[col_letter] = dim.width
-
-        for row_num, dim in sheet.row_dimensions.items():
-            if dim.height:
-                row_heights[row_num] = dim.height
+        col_widths: dict[str, float] = {
+            col_letter: width
+            for col_letter, dim in sheet.column_dimensions.items()
+            if (width := dim.width)
+        }
+        row_heights: dict[int, float] = {
+            row_num: height
+            for row_num, dim in sheet.row_dimensions.items()
+            if (height := dim.height)
+        }
 
         return (col_widths, row_heights)
 
@@ -69,6 +92,7 @@ class ExcelStyleExtractor:
         cell,
         col_widths: dict[str, float] | None,
         row_heights: dict[int, float] | None,
+        fill_cache: dict[int, dict[str, Any]] | None = None,
     ) -> dict[str, Any]:
         """
         セルからスタイル情報を抽出
@@ -77,6 +101,7 @@ class ExcelStyleExtractor:
             cell: openpyxl Cell
             col_widths: 列幅のキャッシュ
             row_heights: 行高さのキャッシュ
+            fill_cache: 背景色情報のキャッシュ（fillId -> fill情報、シート単位で共有）
 
         Returns:
             スタイル情報のdict（fill, width, heightなど）
@@ -84,27 +109,29 @@ class ExcelStyleExtractor:
         styles: dict[str, Any] = {}
 
         # 背景色情報
-        if cell.fill and cell.fill.patternType:
-            fill_info = {
-                "pattern_type": cell.fill.patternType,
-            }
-            fg_color = ExcelStyleExtractor.color_to_hex(cell.fill.fgColor)
-            if fg_color:
-                fill_info["fg_color"] = fg_color
-            bg_color = ExcelStyleExtractor.color_to_hex(cell.fill.bgColor)
-            if bg_color:
-                fill_info["bg_color"] = bg_color
-            styles["fill"] = fill_info
+        fill = cell.fill
+        if fill and fill.patternType:
+            # 同じ塗りつぶしスタイルのセルはfillIdが共通なので、変換結果を再利用する
+            # 注意: _styleはopenpyxlのプライベート属性のため、取得できない場合はキャッシュしない
+            fill_id = getattr(getattr(cell, "_style", None), "fillId", None)
+            if fill_cache is None or fill_id is None:
+                fill_info = ExcelStyleExtractor._build_fill_info(fill)
+            else:
+                fill_info = fill_cache.get(fill_id)
+                if fill_info is None:
+                    fill_info = ExcelStyleExtractor._build_fill_info(fill)
+                    fill_cache[fill_id] = fill_info
+            # キャッシュ済みのdictを共有しないようコピーして返す
+            styles["fill"] = dict(fill_info)
 
         # セルサイズ（列幅・行高さ）
-        # MergedCellの場合は属性が存在しないため、hasattrでチェック
-        if hasattr(cell, "column_letter") and hasattr(cell, "row"):
-            if cell.column_letter and cell.row:
-                # キャッシュから列幅を取得（パフォーマンス最適化）
-                if col_widths and cell.column_letter in col_widths:
-                    styles["width"] = col_widths[cell.column_letter]
-                # キャッシュから行高さを取得（パフォーマンス最適化）
-                if row_heights and cell.row in row_heights:
-                    styles["height"] = row_heights[cell.row]
+        # MergedCellにはcolumn_letterが存在しないため対象外
+        if not isinstance(cell, MergedCell):
+            # キャッシュから列幅を取得（パフォーマンス最適化）
+            if col_widths and (width := col_widths.get(cell.column_letter)):
+                styles["width"] = width
+            # キャッシュから行高さを取得（パフォーマンス最適化）
+            if row_heights and (height := row_heights.get(cell.row)):
+                styles["height"] = height
 
         return styles
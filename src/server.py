@@ -1,8 +1,11 @@
-import base64
+import asyncio
+import binascii
+import hashlib
 import logging
 import sys
-from typing import Any
-from urllib.parse import parse_qs, urlencode, urlparse, urlsplit, urlunsplit
+import time
+from contextvars import ContextVar
+from typing import Any, Literal, overload
 
 from fastmcp import Context, FastMCP
 from fastmcp.server.auth import AccessToken, TokenVerifier
@@ -16,6 +19,18 @@ from src.sharepoint_auth import SharePointCertificateAuth
 from src.sharepoint_excel import SharePointExcelParser
 from src.sharepoint_search import SharePointSearchClient
 
+logger = logging.getLogger(__name__)
+
+# 検証済みトークンを再利用する期間（秒）と保持する最大件数
+_TOKEN_CACHE_TTL_SECONDS = 300
+_TOKEN_CACHE_MAX_SIZE = 1024
+
+# 完了しなかったOAuth認可トランザクションを保持する期間（秒）
+_OAUTH_TRANSACTION_TTL_SECONDS = 600
+
+# sharepoint_docs_searchで指定可能なレスポンス形式
+_VALID_RESPONSE_FORMATS = frozenset({"detailed", "compact", "columnar"})
+
 
 class SharePointTokenVerifier(TokenVerifier):
     """Simple token verifier for SharePoint OAuth tokens
@@ -36,27 +51,55 @@ class SharePointTokenVerifier(TokenVerifier):
         Use with caution and only in environments where the OAuth flow is strictly controlled.
     """
 
+    def __init__(self, *, required_scopes: list[str] | None = None, **kwargs):
+        super().__init__(required_scopes=required_scopes, **kwargs)
+        # トークンのSHA-256ハッシュ -> (有効期限, AccessToken)
+        # 同じトークンはセッション中繰り返し送られるため、生成済みのAccessTokenを再利用する
+        # AccessTokenは元のトークン文字列を保持するため、TTLの間（最大300秒）はメモリに残る
+        self._token_cache: dict[str, tuple[float, AccessToken]] = {}
+
     async def verify_token(self, token: str) -> AccessToken | None:
         """Accept any non-empty token from Azure AD OAuth flow"""
         if not token or not isinstance(token, str):
             return None
 
+        # 辞書のキーにはハッシュを使う（トークン自体は値のAccessToken内に保持される）
+        cache_key = hashlib.sha256(token.encode()).hexdigest()
+        now = time.monotonic()
+        cached = self._token_cache.get(cache_key)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
         # Log security note for audit purposes
         # TODO: Consider adding minimal claim validation (e.g., issuer, expiration) if possible,
         # even without signature verification.
-        logging.warning(
+        logger.warning(
             "Accepting SharePoint token without full cryptographic validation. "
             "This relies on the security of the OIDC proxy flow."
         )
 
         # Create AccessToken with minimal validation
         # The token was obtained through secure OAuth flow, so we trust it
-        return AccessToken(
+        access_token = AccessToken(
             token=token,
             client_id="azure-ad-sharepoint",
             scopes=self.required_scopes or [],
             expires_at=None,  # Azure AD manages expiration
         )
+        # verify_tokenは途中でawaitしないため、イベントループ上ではロック不要
+        if len(self._token_cache) >= _TOKEN_CACHE_MAX_SIZE:
+            self._evict_tokens(now)
+        self._token_cache[cache_key] = (now + _TOKEN_CACHE_TTL_SECONDS, access_token)
+        return access_token
+
+    def _evict_tokens(self, now: float) -> None:
+        """期限切れのトークンを破棄し、それでも上限に達していれば古い順に破棄する"""
+        self._token_cache = {
+            key: entry for key, entry in self._token_cache.items() if entry[0] > now
+        }
+        # dictは挿入順を保持するため、先頭から削除すると古いものから破棄できる
+        while len(self._token_cache) >= _TOKEN_CACHE_MAX_SIZE:
+            del self._token_cache[next(iter(self._token_cache))]
 
 
 class AzureOIDCProxyForSharePoint(OIDCProxy):
@@ -91,47 +134,65 @@ class AzureOIDCProxyForSharePoint(OIDCProxy):
         params: AuthorizationParams,
     ) -> str:
         """Override authorize to remove resource parameter (Azure AD v2.0 doesn't support it)"""
+        # 中断されたフローのトランザクションが溜まり続けないよう、追加前に掃除する
+        self._prune_expired_transactions()
+
         # Get the standard authorization URL from parent class
         upstream_url = await super().authorize(client, params)
 
-        # Parse the URL to check for 'resource' parameter
-        parsed = urlsplit(upstream_url)
-        query_params = parse_qs(parsed.query, keep_blank_values=True)
-
-        # If 'resource' parameter doesn't exist, return URL as-is
-        if "resource" not in query_params:
+        # If 'resource' doesn't appear in the query, return URL as-is without parsing
+        base_url, _, query_and_fragment = upstream_url.partition("?")
+        if "resource" not in query_and_fragment:
             return upstream_url
 
         # Remove 'resource' parameter (Azure AD v2.0 doesn't support RFC 8707)
-        del query_params["resource"]
-
-        # Rebuild query string (urlencode with doseq=True handles list values)
-        new_query = urlencode(
-            query_params,
-            doseq=True,
-        )
+        # Other parameters are kept exactly as encoded by the parent class
+        query, fragment_sep, fragment = query_and_fragment.partition("#")
+        params_list = query.split("&")
+        kept_params = [
+            param for param in params_list if param.partition("=")[0] != "resource"
+        ]
+        if len(kept_params) == len(params_list):
+            return upstream_url
 
         # Reconstruct and return the URL
-        return str(
-            urlunsplit(
-                (parsed.scheme, parsed.netloc, parsed.path, new_query, parsed.fragment)
-            )
-        )
+        new_query = "&".join(kept_params)
+        query_part = f"?{new_query}" if new_query else ""
+        return f"{base_url}{query_part}{fragment_sep}{fragment}"
+
+    def _prune_expired_transactions(self) -> None:
+        """Remove OAuth transactions whose flow was never completed
+
+        The parent class removes a transaction only when the IdP callback arrives,
+        so abandoned authorization flows would otherwise stay in memory forever.
+        """
+        expires_before = time.time() - _OAUTH_TRANSACTION_TTL_SECONDS
+        expired_txn_ids = [
+            txn_id
+            for txn_id, transaction in self._oauth_transactions.items()
+            if transaction.get("created_at", 0) < expires_before
+        ]
+        for txn_id in expired_txn_ids:
+            del self._oauth_transactions[txn_id]
+
+
+# OAuthモードで処理中のリクエストのアクセストークン
+# asyncio.to_threadはコンテキストを引き継ぐため、ワーカースレッドからも参照できる
+_current_oauth_token: ContextVar[str] = ContextVar("sharepoint_oauth_token")
 
 
 class SimpleTokenAuth:
     """Simple token-based authentication for OAuth mode
 
-    This class wraps an access token obtained from FastMCP's authentication context
-    and provides the same interface as SharePointCertificateAuth.
+    This class returns the access token of the current request, which is obtained
+    from FastMCP's authentication context and stored in a ContextVar, and provides
+    the same interface as SharePointCertificateAuth. A single instance can
+    therefore be shared by all requests.
     """
 
-    def __init__(self, token: str):
-        self._token = token
-
     def get_access_token(self) -> str:
-        """Return the access token"""
-        return self._token
+        """Return the access token of the current request"""
+        return _current_oauth_token.get()
 
 
 # MCPサーバーの認証プロバイダを設定
@@ -149,22 +210,30 @@ def _create_auth_provider():
                 "Ensure SHAREPOINT_OAUTH_CLIENT_ID (or SHAREPOINT_CLIENT_ID), "
                 "SHAREPOINT_OAUTH_CLIENT_SECRET, and SHAREPOINT_TENANT_ID are set."
             )
-            logging.error(error_msg)
+            logger.error(error_msg)
             raise ValueError(error_msg)
 
         # OAuth mode: Use OIDC Proxy to protect MCP server with Azure AD
         # Extract tenant name from site URL for SharePoint scope
-        parsed_url = urlparse(config.site_url)
-        tenant_name = parsed_url.netloc.split(".sharepoint.com")[0]
+        # e.g. "https://contoso.sharepoint.com/sites/x" -> "contoso" (plain string ops, no urlparse)
+        host = config.site_url.partition("://")[2].partition("/")[0]
+        tenant_name = host.partition(".sharepoint.com")[0]
+        if not tenant_name:
+            error_msg = (
+                f"Could not determine the SharePoint tenant from site URL "
+                f"'{config.site_url}'. Check SHAREPOINT_BASE_URL."
+            )
+            logger.error(error_msg)
+            raise ValueError(error_msg)
 
         # Azure AD OIDC configuration URL (v2.0)
         config_url = f"https://login.microsoftonline.com/{config.tenant_id}/v2.0/.well-known/openid-configuration"
 
         # Use custom OIDC Proxy that removes unsupported 'resource' parameter for Azure AD v2.0
         allowed_uris = config.get_oauth_allowed_redirect_uris()
-        logging.info(f"OAuth allowed redirect URIs: {allowed_uris}")
+        logger.info("OAuth allowed redirect URIs: %s", allowed_uris)
         if allowed_uris == []:
-            logging.warning(
+            logger.warning(
                 "OAuth mode is enabled, and SHAREPOINT_OAUTH_ALLOWED_REDIRECT_URIS is set to an empty string. "
                 "No client redirect URIs will be allowed, which will likely cause authentication to fail."
             )
@@ -193,6 +262,12 @@ mcp = FastMCP(name="SharePointDocsMCP", auth=_create_auth_provider())
 # SharePointクライアントのグローバルインスタンス
 _sharepoint_client: SharePointSearchClient | None = None
 
+# 設定の検証が成功済みかどうか（検証はプロセスごとに1回だけ行う）
+_config_validated = False
+
+# OAuthモードのSharePointクライアント（トークンはリクエストごとにContextVarで切り替える）
+_oauth_client: SharePointSearchClient | None = None
+
 
 def setup_logging():
     """
@@ -211,7 +286,7 @@ def setup_logging():
     stream_handler.setFormatter(log_formatter)
     root_logger.addHandler(stream_handler)
 
-    logging.info("Logging configured to output to stderr.")
+    logger.info("Logging configured to output to stderr.")
 
 
 def _get_auth_client() -> SharePointCertificateAuth | None:
@@ -256,24 +331,24 @@ def _get_token_from_request(ctx: Context | None = None) -> str | None:
             request = get_http_request()
         except RuntimeError as e:
             # Not in HTTP context (e.g., stdio mode) - expected behavior
-            logging.debug(f"Not in HTTP context, skipping Authorization header: {e}")
+            logger.debug("Not in HTTP context, skipping Authorization header: %s", e)
         except AttributeError as e:
             # Unexpected attribute error - may indicate a code bug
-            logging.warning(f"Unexpected error accessing HTTP request: {e}")
+            logger.warning("Unexpected error accessing HTTP request: %s", e)
         else:
             auth_header = request.headers.get("Authorization", "")
             if auth_header.lower().startswith("bearer "):
                 token = auth_header[len("bearer ") :].strip()
                 if token:
-                    logging.info("Token retrieved from Authorization header")
+                    logger.info("Token retrieved from Authorization header")
                     return token
                 else:
-                    logging.warning("Empty token in Authorization header")
+                    logger.warning("Empty token in Authorization header")
 
     # Fallback to FastMCP's OAuth flow token
     access_token = get_access_token()
     if access_token:
-        logging.info("Token retrieved from FastMCP OAuth context")
+        logger.info("Token retrieved from FastMCP OAuth context")
         return access_token.token
 
     return None
@@ -283,24 +358,25 @@ def _get_sharepoint_client(ctx: Context | None = None) -> SharePointSearchClient
     """SharePointクライアントを取得または初期化
 
     - 証明書モード: シングルトンクライアントを使用
-    - OAuthモード: リクエストごとに新しいクライアントを作成（トークンはリクエスト依存）
+    - OAuthモード: 共有クライアントを使用し、トークンはリクエストごとに設定
 
     Args:
         ctx: FastMCP context for accessing HTTP request (OAuth mode only)
     """
-    global _sharepoint_client
+    global _sharepoint_client, _config_validated
 
-    # 設定の検証（初回のみ）
-    if _sharepoint_client is None:
+    # 設定の検証（成功するまでの初回のみ。OAuthモードでも毎リクエスト検証しない）
+    if not _config_validated:
         validation_errors = config.validate()
         if validation_errors:
             error_msg = "SharePoint configuration is invalid: " + "; ".join(
                 validation_errors
             )
-            logging.error(error_msg)
+            logger.error(error_msg)
             raise ValueError(error_msg)
+        _config_validated = True
 
-    # OAuthモード: リクエストごとに新しいクライアントを作成
+    # OAuthモード: 共有クライアントにリクエストのトークンを設定して使用
     if config.is_oauth_mode:
         # Get token from Authorization header or FastMCP context
         token = _get_token_from_request(ctx)
@@ -310,14 +386,8 @@ def _get_sharepoint_client(ctx: Context | None = None) -> SharePointSearchClient
                 "Please provide token via Authorization header or authenticate with FastMCP's OAuth flow."
             )
 
-        # SimpleTokenAuthでトークンをラップ
-        auth = SimpleTokenAuth(token=token)
-
-        # SharePointクライアントを作成（リクエストごと）
-        return SharePointSearchClient(
-            site_url=config.site_url,
-            auth=auth,
-        )
+        _current_oauth_token.set(token)
+        return _get_oauth_client()
 
     # 証明書モード: シングルトンクライアントを使用
     if _sharepoint_client is None:
@@ -332,18 +402,67 @@ def _get_sharepoint_client(ctx: Context | None = None) -> SharePointSearchClient
             auth=auth,
         )
 
-        logging.info("SharePoint client initialized successfully (certificate mode)")
+        logger.info("SharePoint client initialized successfully (certificate mode)")
 
     return _sharepoint_client
 
 
-def sharepoint_docs_search(
+def _get_oauth_client() -> SharePointSearchClient:
+    """OAuthモードの共有SharePointクライアントを取得または作成
+
+    クライアントはトークンを直接保持せず、SimpleTokenAuthを通じて
+    リクエストごとのトークンを参照するため、全リクエストで再利用できる。
+    """
+    global _oauth_client
+
+    if _oauth_client is None:
+        _oauth_client = SharePointSearchClient(
+            site_url=config.site_url,
+            auth=SimpleTokenAuth(),
+        )
+        logger.info("SharePoint client initialized successfully (OAuth mode)")
+
+    return _oauth_client
+
+
+@overload
+async def sharepoint_docs_search(
+    query: str,
+    max_results: int = ...,
+    file_extensions: list[str] | None = ...,
+    response_format: Literal["detailed", "compact"] = ...,
+    ctx: Context | None = ...,
+) -> list[dict[str, Any]]: ...
+
+
+@overload
+async def sharepoint_docs_search(
+    query: str,
+    max_results: int = ...,
+    file_extensions: list[str] | None = ...,
+    *,
+    response_format: Literal["columnar"],
+    ctx: Context | None = ...,
+) -> dict[str, list[Any]]: ...
+
+
+@overload
+async def sharepoint_docs_search(
+    query: str,
+    max_results: int = ...,
+    file_extensions: list[str] | None = ...,
+    response_format: str = ...,
+    ctx: Context | None = ...,
+) -> list[dict[str, Any]] | dict[str, list[Any]]: ...
+
+
+async def sharepoint_docs_search(
     query: str,
     max_results: int = 20,
     file_extensions: list[str] | None = None,
     response_format: str = "detailed",
     ctx: Context | None = None,
-) -> list[dict[str, Any]]:
+) -> list[dict[str, Any]] | dict[str, list[Any]]:
     """
     Search for documents in SharePoint with response format options
 
@@ -351,21 +470,22 @@ def sharepoint_docs_search(
         query: Search keywords
         max_results: Maximum number of results to return (default: 20, max: 100)
         file_extensions: List of file extensions to search (e.g., ["pdf", "docx"])
-        response_format: Response format - "detailed" (default) or "compact"
+        response_format: Response format - "detailed" (default), "compact" or "columnar"
         ctx: FastMCP context (injected automatically)
 
     Returns:
         List of search results. Each result contains:
         - Detailed format: all available fields (title, path, size, modified, extension, summary)
         - Compact format: essential fields only (title, path, extension)
+        Columnar format returns the compact fields as parallel lists instead:
+        {"title": [...], "path": [...], "extension": [...]}
     """
-    logging.info(f"Searching SharePoint documents with query: '{query}'")
+    logger.info("Searching SharePoint documents with query: '%s'", query)
 
     # Validate response_format parameter
-    valid_formats = ["detailed", "compact"]
-    if response_format not in valid_formats:
-        logging.warning(
-            f"Invalid response_format '{response_format}'. Defaulting to 'detailed'"
+    if response_format not in _VALID_RESPONSE_FORMATS:
+        logger.warning(
+            "Invalid response_format '%s'. Defaulting to 'detailed'", response_format
         )
         response_format = "detailed"
 
@@ -378,10 +498,10 @@ def sharepoint_docs_search(
             allowed_extensions = [
                 ext
                 for ext in file_extensions
-                if ext.lower() in config.allowed_file_extensions
+                if ext.lower() in config.allowed_file_extension_set
             ]
             if not allowed_extensions:
-                logging.warning("No allowed file extensions found in the request")
+                logger.warning("No allowed file extensions found in the request")
         else:
             allowed_extensions = None
 
@@ -389,34 +509,43 @@ def sharepoint_docs_search(
         max_results = min(max_results, 100)
 
         # Execute search
-        results = client.search_documents(
+        # 通信は同期I/Oのため、イベントループを塞がないようスレッドで実行する
+        results = await asyncio.to_thread(
+            client.search_documents,
             query=query,
             max_results=max_results,
             file_extensions=allowed_extensions,
         )
 
         # Apply response format filtering
-        if response_format == "compact":
+        if response_format == "compact" and results:
             # Return only essential fields for compact format
-            filtered_results = []
-            for result in results:
-                compact_result = {
+            results = [
+                {
                     "title": result.get("title", "Unknown"),
                     "path": result.get("path", ""),
                     "extension": result.get("extension", ""),
                 }
-                filtered_results.append(compact_result)
-            results = filtered_results
+                for result in results
+            ]
+
+        logger.info("SharePoint search completed. Found %d documents", len(results))
 
-        logging.info(f"SharePoint search completed. Found {len(results)} documents")
+        if response_format == "columnar":
+            # Return the compact fields as parallel lists (no per-result keys)
+            return {
+                "title": [result.get("title", "Unknown") for result in results],
+                "path": [result.get("path", "") for result in results],
+                "extension": [result.get("extension", "") for result in results],
+            }
         return results
 
     except Exception as e:
-        logging.error(f"SharePoint search failed: {str(e)}")
+        logger.error("SharePoint search failed: %s", e)
         raise handle_sharepoint_error(e, "search") from e
 
 
-def sharepoint_docs_download(file_path: str, ctx: Context | None = None) -> str:
+async def sharepoint_docs_download(file_path: str, ctx: Context | None = None) -> str:
     """
     Download a file from SharePoint
 
@@ -427,27 +556,43 @@ def sharepoint_docs_download(file_path: str, ctx: Context | None = None) -> str:
     Returns:
         ダウンロードしたファイルの内容（Base64エンコード済み文字列）
     """
-    logging.info(f"Downloading SharePoint file: {file_path}")
+    logger.info("Downloading SharePoint file: %s", file_path)
 
     try:
         client = _get_sharepoint_client(ctx)
 
-        # ファイルをダウンロード
-        file_content = client.download_file(file_path)
-
-        # Base64エンコードして返す
-        encoded_content = base64.b64encode(file_content).decode("utf-8")
-
-        logging.info(
-            f"SharePoint file download completed. Size: {len(file_content)} bytes"
+        # 通信とエンコードは同期処理のため、イベントループを塞がないようスレッドで実行する
+        encoded_content, file_size = await asyncio.to_thread(
+            _download_as_base64, client, file_path
         )
+
+        logger.info("SharePoint file download completed. Size: %d bytes", file_size)
         return encoded_content
 
     except Exception as e:
-        logging.error(f"SharePoint file download failed: {str(e)}")
+        logger.error("SharePoint file download failed: %s", e)
         raise handle_sharepoint_error(e, "download") from e
 
 
+def _download_as_base64(
+    client: SharePointSearchClient, file_path: str
+) -> tuple[str, int]:
+    """ファイルをダウンロードしてBase64文字列とファイルサイズを返す
+
+    ファイルをチャンク単位でダウンロードしながらBase64エンコードする
+    （ファイル全体のbytesを保持しないため、ピークメモリを抑えられる）。
+    チャンクは3の倍数の長さで届くため、個別にエンコードして連結できる。
+    """
+    encoded = bytearray()
+    file_size = 0
+    for chunk in client.download_file_stream(file_path):
+        encoded += binascii.b2a_base64(chunk, newline=False)
+        file_size += len(chunk)
+
+    # Base64はASCIIのみのため、asciiでデコードして返す
+    return encoded.decode("ascii"), file_size
+
+
 def sharepoint_excel(
     file_path: str,
     query: str | None = None,
@@ -487,9 +632,12 @@ def sharepoint_excel(
     Returns:
         JSON文字列
     """
-    logging.info(
-        f"SharePoint Excel operation: {file_path} "
-        f"(query={query}, sheet={sheet}, cell_range={cell_range})"
+    logger.info(
+        "SharePoint Excel operation: %s (query=%s, sheet=%s, cell_range=%s)",
+        file_path,
+        query,
+        sheet,
+        cell_range,
     )
 
     try:
@@ -516,7 +664,7 @@ def sharepoint_excel(
         )
 
     except Exception as e:
-        logging.error(f"SharePoint Excel operation failed: {str(e)}")
+        logger.error("SharePoint Excel operation failed: %s", e)
         raise handle_sharepoint_error(
             e,
             "excel_parse",
@@ -536,15 +684,15 @@ def register_tools():
     """
     if config.is_tool_enabled("sharepoint_docs_search"):
         mcp.tool(description=config.search_tool_description)(sharepoint_docs_search)
-        logging.info("Registered tool: sharepoint_docs_search")
+        logger.info("Registered tool: sharepoint_docs_search")
     else:
-        logging.info("Tool disabled: sharepoint_docs_search")
+        logger.info("Tool disabled: sharepoint_docs_search")
 
     if config.is_tool_enabled("sharepoint_docs_download"):
         mcp.tool(description=config.download_tool_description)(sharepoint_docs_download)
-        logging.info("Registered tool: sharepoint_docs_download")
+        logger.info("Registered tool: sharepoint_docs_download")
     else:
-        logging.info("Tool disabled: sharepoint_docs_download")
+        logger.info("Tool disabled: sharepoint_docs_download")
 
     if config.is_tool_enabled("sharepoint_excel"):
         mcp.tool(
@@ -566,6 +714,6 @@ def register_tools():
                 "Response: rows (value + coordinate), sheet info (dimensions, frozen_rows/cols, freeze_panes/merged_ranges)."
             )
         )(sharepoint_excel)
-        logging.info("Registered tool: sharepoint_excel")
+        logger.info("Registered tool: sharepoint_excel")
     else:
-        logging.info("Tool disabled: sharepoint_excel")
+        logger.info("Tool disabled: sharepoint_excel")
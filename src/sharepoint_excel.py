@@ -541,8 +541,10 @@ class SharePointExcelParser:
         # セルサイズのキャッシュを構築（ヘルパークラスを使用）
         col_widths: dict[str, float] | None = None
         row_heights: dict[int, float] | None = None
+        fill_cache: dict[int, dict[str, Any]] | None = None
         if include_cell_styles:
             col_widths, row_heights = ExcelStyleExtractor.build_cell_size_cache(sheet)
+            fill_cache = {}
 
         # データ取得
         if cell_range:
@@ -560,6 +562,7 @@ class SharePointExcelParser:
                         merged_anchor_value_map,
                         col_widths,
                         row_heights,
+                        fill_cache,
                     )
                 )
 
@@ -574,6 +577,7 @@ class SharePointExcelParser:
                     merged_anchor_value_map,
                     col_widths,
                     row_heights,
+                    fill_cache,
                 )
             )
 
@@ -590,6 +594,7 @@ class SharePointExcelParser:
                         merged_anchor_value_map,
                         col_widths,
                         row_heights,
+                        fill_cache,
                     )
                 )
 
@@ -604,6 +609,7 @@ class SharePointExcelParser:
         merged_anchor_value_map: dict[str, Any] | None = None,
         col_widths: dict[str, float] | None = None,
         row_heights: dict[int, float] | None = None,
+        fill_cache: dict[int, dict[str, Any]] | None = None,
     ) -> dict[str, Any]:
         """
         セルを解析してdict形式で返す
@@ -615,6 +621,7 @@ class SharePointExcelParser:
             merged_anchor_value_map: マージ範囲 -> アンカー値 のマップ（結合セルの値埋め用）
             col_widths: 列幅のキャッシュ（パフォーマンス最適化用）
             row_heights: 行高さのキャッシュ（パフォーマンス最適化用）
+            fill_cache: 背景色情報のキャッシュ（パフォーマンス最適化用）
 
         Returns:
             セルデータのdict
@@ -643,7 +650,7 @@ class SharePointExcelParser:
         # スタイル情報（include_cell_styles=Trueの場合のみ）（ヘルパークラスを使用）
         if include_cell_styles:
             styles = ExcelStyleExtractor.extract_cell_styles(
-                cell, col_widths, row_heights
+                cell, col_widths, row_heights, fill_cache
             )
             # スタイル情報をcell_dataにマージ
             cell_data.update(styles)
@@ -658,6 +665,7 @@ class SharePointExcelParser:
         merged_anchor_value_map: dict[str, Any] | None = None,
         col_widths: dict[str, float] | None = None,
         row_heights: dict[int, float] | None = None,
+        fill_cache: dict[int, dict[str, Any]] | None = None,
     ) -> list[list[dict[str, Any]]]:
         """
         行データを解析してリスト形式で返す（コード重複削減用ヘルパー）
@@ -669,6 +677,7 @@ class SharePointExcelParser:
             merged_anchor_value_map: マージ範囲 -> アンカー値
             col_widths: 列幅のキャッシュ（パフォーマンス最適化用）
             row_heights: 行高さのキャッシュ（パフォーマンス最適化用）
+            fill_cache: 背景色情報のキャッシュ（パフォーマンス最適化用）
 
         Returns:
             解析された行データのリスト
@@ -683,6 +692,7 @@ class SharePointExcelParser:
                     merged_anchor_value_map,
                     col_widths,
                     row_heights,
+                    fill_cache,
                 )
                 for cell in row
             ]
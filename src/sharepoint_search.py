@@ -3,6 +3,7 @@ SharePoint検索機能モジュール
 """
 
 import logging
+from collections.abc import Iterator
 from typing import Any, Protocol
 from urllib.parse import quote, unquote, urlparse
 
@@ -13,6 +14,9 @@ from src.error_messages import handle_sharepoint_error
 
 logger = logging.getLogger(__name__)
 
+# ストリーミングダウンロードのチャンクサイズ（Base64の4文字単位に揃うよう3の倍数）
+DOWNLOAD_CHUNK_SIZE = 3 * 65536
+
 
 class AuthClient(Protocol):
     """認証クライアントのプロトコル（証明書認証/OAuth両対応）"""
@@ -177,8 +181,7 @@ class SharePointSearchClient:
         )
 
         for target in onedrive_targets:
-            onedrive_path = target["onedrive_path"]
-            full_path = f"{onedrive_base_url}/{onedrive_path}"
+            full_path = f"{onedrive_base_url}/{target.onedrive_path}"
             filters.append(f'path:"{full_path}"')
 
         return filters
@@ -208,72 +211,149 @@ class SharePointSearchClient:
         logger.info(f"Downloading file: {file_path}")
 
         try:
-            # アクセストークンを取得
-            access_token = self.auth.get_access_token()
+            response = self._request_file(file_path, stream=False)
+            return response.content
 
-            headers = {
-                "Authorization": f"Bearer {access_token}",
-                "Accept": "application/octet-stream",  # ファイルバイナリを要求
-            }
+        except Exception as e:
+            logger.error(f"File download failed: {str(e)}")
+            # OneDriveファイルかどうかを判定してエラーメッセージを調整
+            raise handle_sharepoint_error(
+                e, "download", is_onedrive_file=self._is_onedrive_path(file_path)
+            ) from e
 
-            # SharePointのファイルパスからサーバー相対URLを抽出
-            parsed_url = urlparse(file_path)
-            server_relative_url = unquote(parsed_url.path)
+    def download_file_stream(
+        self, file_path: str, chunk_size: int = DOWNLOAD_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """
+        SharePointからファイルをチャンク単位でダウンロード
 
-            # ファイルのパスから適切なサイトURLを決定
-            # OneDriveファイルかどうかを判定
-            path_segments = server_relative_url.split("/")
-            is_onedrive_file = (
-                len(path_segments) >= 2 and path_segments[1] == "personal"
-            )
+        ファイル全体をメモリに展開せずに処理するためのストリーミング版。
+        最後のチャンク以外は3の倍数の長さに揃えるため、
+        各チャンクを個別にBase64エンコードして連結できる。
 
-            if is_onedrive_file:
-                # OneDriveファイルの場合は個人用サイトのAPIエンドポイントを使用
-                onedrive_base_url = global_config.base_url.replace(
-                    ".sharepoint.com", "-my.sharepoint.com"
-                )
-                if len(path_segments) >= 3:
-                    personal_site_name = path_segments[2]
-                    api_base_url = f"{onedrive_base_url}/personal/{personal_site_name}"
-                else:
-                    # 通常は発生しないが、フォールバックとして-my.sharepoint.comドメインを使用
-                    api_base_url = onedrive_base_url
-            elif global_config.is_site_specific:
-                # 特定サイト設定の場合はそのサイトのAPIを使用
-                api_base_url = self.site_url
-            else:
-                # テナント全体設定の場合はファイルパスからサイトを特定
-                if len(path_segments) >= 3 and path_segments[1] == "sites":
-                    site_name = path_segments[2]
-                    api_base_url = f"{global_config.base_url}/sites/{site_name}"
-                else:
-                    # サイト形式でない場合はベースURLを使用
-                    api_base_url = global_config.base_url
-
-            logger.info(f"Downloading from: {api_base_url}")
-
-            # SharePointとOneDriveで異なるダウンロード方式を使用
-            if is_onedrive_file:
-                # OneDrive用：GetFileByServerRelativePath（特殊文字対応）を優先
-                return self._download_onedrive_file(
-                    api_base_url, server_relative_url, headers
-                )
-            else:
-                # SharePoint用：GetFileByServerRelativeUrlを優先
-                return self._download_sharepoint_file(
-                    api_base_url, server_relative_url, headers
-                )
+        Args:
+            file_path: ファイルのフルパス（search_documentsの結果から取得）
+            chunk_size: 1チャンクの目安サイズ（3の倍数）
+
+        Yields:
+            ファイルの内容（bytes）のチャンク
+        """
+        logger.info(f"Downloading file (stream): {file_path}")
+
+        try:
+            with self._request_file(file_path, stream=True) as response:
+                pending = bytearray()
+                for data in response.iter_content(chunk_size=chunk_size):
+                    pending += data
+                    if len(pending) >= chunk_size:
+                        # 受信サイズは揃っていないことがあるため、3の倍数で切り出す
+                        aligned = len(pending) - len(pending) % 3
+                        yield bytes(pending[:aligned])
+                        del pending[:aligned]
+                if pending:
+                    yield bytes(pending)
 
         except Exception as e:
             logger.error(f"File download failed: {str(e)}")
             # OneDriveファイルかどうかを判定してエラーメッセージを調整
             raise handle_sharepoint_error(
-                e, "download", is_onedrive_file=is_onedrive_file
+                e, "download", is_onedrive_file=self._is_onedrive_path(file_path)
             ) from e
 
+    @staticmethod
+    def _is_onedrive_path(file_path: str) -> bool:
+        """ファイルパスがOneDrive（/personal/配下）のものかどうか"""
+        path_segments = unquote(urlparse(file_path).path).split("/")
+        return len(path_segments) >= 2 and path_segments[1] == "personal"
+
+    def _request_file(self, file_path: str, stream: bool) -> requests.Response:
+        """
+        ファイル本体を取得するリクエストを送信し、成功したレスポンスを返す
+
+        Args:
+            file_path: ファイルのフルパス（search_documentsの結果から取得）
+            stream: Trueの場合は本文を読み込まずにレスポンスを返す
+        """
+        # アクセストークンを取得
+        access_token = self.auth.get_access_token()
+
+        headers = {
+            "Authorization": f"Bearer {access_token}",
+            "Accept": "application/octet-stream",  # ファイルバイナリを要求
+        }
+
+        # SharePointのファイルパスからサーバー相対URLを抽出
+        parsed_url = urlparse(file_path)
+        server_relative_url = unquote(parsed_url.path)
+
+        # ファイルのパスから適切なサイトURLを決定
+        # OneDriveファイルかどうかを判定
+        path_segments = server_relative_url.split("/")
+        is_onedrive_file = self._is_onedrive_path(file_path)
+
+        if is_onedrive_file:
+            # OneDriveファイルの場合は個人用サイトのAPIエンドポイントを使用
+            onedrive_base_url = global_config.base_url.replace(
+                ".sharepoint.com", "-my.sharepoint.com"
+            )
+            if len(path_segments) >= 3:
+                personal_site_name = path_segments[2]
+                api_base_url = f"{onedrive_base_url}/personal/{personal_site_name}"
+            else:
+                # 通常は発生しないが、フォールバックとして-my.sharepoint.comドメインを使用
+                api_base_url = onedrive_base_url
+        elif global_config.is_site_specific:
+            # 特定サイト設定の場合はそのサイトのAPIを使用
+            api_base_url = self.site_url
+        else:
+            # テナント全体設定の場合はファイルパスからサイトを特定
+            if len(path_segments) >= 3 and path_segments[1] == "sites":
+                site_name = path_segments[2]
+                api_base_url = f"{global_config.base_url}/sites/{site_name}"
+            else:
+                # サイト形式でない場合はベースURLを使用
+                api_base_url = global_config.base_url
+
+        logger.info(f"Downloading from: {api_base_url}")
+
+        # SharePointとOneDriveで異なるダウンロード方式を使用
+        if is_onedrive_file:
+            # OneDrive用：GetFileByServerRelativePath（特殊文字対応）を優先
+            return self._download_onedrive_file(
+                api_base_url, server_relative_url, headers, stream
+            )
+        else:
+            # SharePoint用：GetFileByServerRelativeUrlを優先
+            return self._download_sharepoint_file(
+                api_base_url, server_relative_url, headers, stream
+            )
+
+    @staticmethod
+    def _get_file_response(
+        download_url: str, headers: dict, stream: bool
+    ) -> requests.Response:
+        """
+        ファイル取得リクエストを送信し、成功したレスポンスを返す
+        失敗時はレスポンスを閉じてから例外を送出する（フォールバック前に接続を解放するため）
+        """
+        response = requests.get(
+            download_url, headers=headers, timeout=60, stream=stream
+        )
+        try:
+            response.raise_for_status()
+        except Exception:
+            # stream=Trueの場合、閉じないと接続がガベージコレクションまで解放されない
+            response.close()
+            raise
+        return response
+
     def _download_onedrive_file(
-        self, api_base_url: str, server_relative_url: str, headers: dict
-    ) -> bytes:
+        self,
+        api_base_url: str,
+        server_relative_url: str,
+        headers: dict,
+        stream: bool = False,
+    ) -> requests.Response:
         """
         OneDriveファイルのダウンロード
         特殊文字対応のGetFileByServerRelativePathを優先し、失敗時にGetFileByServerRelativeUrlにフォールバック
@@ -284,9 +364,7 @@ class SharePointSearchClient:
             escaped_path = server_relative_url.replace("'", "''")
             encoded_path = quote(escaped_path, safe="/")
             download_url = f"{api_base_url}/_api/web/GetFileByServerRelativePath(decodedUrl=@f)/$value?@f='{encoded_path}'"
-            response = requests.get(download_url, headers=headers, timeout=60)
-            response.raise_for_status()
-            return response.content
+            return self._get_file_response(download_url, headers, stream)
         except Exception as e:
             logger.debug(f"GetFileByServerRelativePath failed: {str(e)}")
 
@@ -295,16 +373,18 @@ class SharePointSearchClient:
             # シングルクォートをエスケープ（SharePoint REST API仕様）
             escaped_path = server_relative_url.replace("'", "''")
             download_url = f"{api_base_url}/_api/web/GetFileByServerRelativeUrl('{escaped_path}')/$value"
-            response = requests.get(download_url, headers=headers, timeout=60)
-            response.raise_for_status()
-            return response.content
+            return self._get_file_response(download_url, headers, stream)
         except Exception as e:
             logger.error(f"All OneDrive download methods failed: {str(e)}")
             raise
 
     def _download_sharepoint_file(
-        self, api_base_url: str, server_relative_url: str, headers: dict
-    ) -> bytes:
+        self,
+        api_base_url: str,
+        server_relative_url: str,
+        headers: dict,
+        stream: bool = False,
+    ) -> requests.Response:
         """
         SharePointファイルのダウンロード
         GetFileByServerRelativeUrlを優先し、失敗時にGetFileByServerRelativePathにフォールバック
@@ -314,9 +394,7 @@ class SharePointSearchClient:
             # シングルクォートをエスケープ（SharePoint REST API仕様）
             escaped_path = server_relative_url.replace("'", "''")
             download_url = f"{api_base_url}/_api/web/GetFileByServerRelativeUrl('{escaped_path}')/$value"
-            response = requests.get(download_url, headers=headers, timeout=60)
-            response.raise_for_status()
-            return response.content
+            return self._get_file_response(download_url, headers, stream)
         except Exception as e:
             logger.debug(f"GetFileByServerRelativeUrl failed: {str(e)}")
 
@@ -326,9 +404,7 @@ class SharePointSearchClient:
             escaped_path = server_relative_url.replace("'", "''")
             encoded_path = quote(escaped_path, safe="/")
             download_url = f"{api_base_url}/_api/web/GetFileByServerRelativePath(decodedUrl=@f)/$value?@f='{encoded_path}'"
-            response = requests.get(download_url, headers=headers, timeout=60)
-            response.raise_for_status()
-            return response.content
+            return self._get_file_response(download_url, headers, stream)
         except Exception as e:
             logger.error(f"All SharePoint download methods failed: {str(e)}")
             raise
@@ -19,6 +19,7 @@ def mock_config():
     config.private_key_text = "mock-private-key"
     config.default_max_results = 20
     config.allowed_file_extensions = ["pdf", "docx", "xlsx"]
+    config.allowed_file_extension_set = frozenset(config.allowed_file_extensions)
     config.search_tool_description = "Test search tool"
     config.download_tool_description = "Test download tool"
 
@@ -79,5 +80,6 @@ def mock_sharepoint_client():
             }
         ]
         client_instance.download_file.return_value = b"mock file content"
+        client_instance.download_file_stream.return_value = [b"mock file content"]
         mock_client.return_value = client_instance
         yield client_instance
@@ -3,6 +3,7 @@ ExcelRangeCalculatorのテスト
 """
 
 import pytest
+from openpyxl.utils.exceptions import CellCoordinatesException
 
 from src.excel import ExcelRangeCalculator
 
@@ -10,6 +11,18 @@ from src.excel import ExcelRangeCalculator
 class TestExcelRangeCalculator:
     """ExcelRangeCalculator（範囲計算）のテスト"""
 
+    # parse_coordinate のテスト
+
+    def test_parse_coordinate_basic(self):
+        """セル座標が列文字と行番号に分解されること"""
+        assert ExcelRangeCalculator.parse_coordinate("B12") == ("B", 12)
+        assert ExcelRangeCalculator.parse_coordinate("$AA$3") == ("AA", 3)
+
+    def test_parse_coordinate_invalid_raises(self):
+        """無効な座標の場合はCellCoordinatesExceptionが発生すること"""
+        with pytest.raises(CellCoordinatesException):
+            ExcelRangeCalculator.parse_coordinate("INVALID")
+
     # calculate_header_range のテスト
 
     def test_calculate_header_range_with_frozen_rows(self):
@@ -144,6 +157,14 @@ class TestExcelRangeCalculator:
         assert rows == 0
         assert cols == 0
 
+    def test_calculate_range_size_logs_every_invalid_call(self, caplog):
+        """無効な範囲は呼び出しごとに警告が記録されること（エラーはキャッシュしない）"""
+        with caplog.at_level("WARNING", logger="src.excel.range_calculator"):
+            ExcelRangeCalculator.calculate_range_size("Z9:A1")
+            ExcelRangeCalculator.calculate_range_size("Z9:A1")
+
+        assert len(caplog.records) == 2
+
     # normalize_column_range のテスト
 
     def test_normalize_column_range_single_column(self):
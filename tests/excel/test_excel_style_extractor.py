@@ -108,6 +108,28 @@ class TestExcelStyleExtractor:
         assert "fg_color" in styles["fill"]
         assert styles["fill"]["fg_color"] == "#FFFF00"
 
+    def test_extract_cell_styles_with_fill_cache(self):
+        """同じ塗りつぶしのセルはfill_cacheの結果が再利用されること"""
+        wb = Workbook()
+        ws = wb.active
+        fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
+        ws["A1"].fill = fill
+        ws["A2"].fill = fill
+
+        fill_cache: dict = {}
+        styles1 = ExcelStyleExtractor.extract_cell_styles(
+            ws["A1"], None, None, fill_cache
+        )
+        styles2 = ExcelStyleExtractor.extract_cell_styles(
+            ws["A2"], None, None, fill_cache
+        )
+
+        assert len(fill_cache) == 1
+        assert styles1["fill"] == styles2["fill"]
+        assert styles1["fill"]["fg_color"] == "#FFFF00"
+        # キャッシュ済みのdictは共有されない
+        assert styles1["fill"] is not styles2["fill"]
+
     def test_extract_cell_styles_with_size(self):
         """列幅・行高さが設定されているセル"""
         wb = Workbook()
@@ -35,6 +35,16 @@ class TestSharePointConfig:
                 for error in validation_errors
             )
 
+    def test_validate_returns_independent_copy(self):
+        """validateの戻り値を変更してもキャッシュされた検証結果に影響しないことのテスト"""
+        with patch.dict(os.environ, {}, clear=True):
+            config = SharePointConfig()
+            validation_errors = config.validate()
+            validation_errors.clear()
+
+            assert len(config.validate()) > 0
+            assert config.is_valid is False
+
     def test_certificate_text_priority_over_file(self):
         """証明書テキストがファイルパスより優先されることのテスト"""
         env_vars = {
@@ -72,6 +82,9 @@ class TestSharePointConfig:
             config = SharePointConfig()
 
             assert config.allowed_file_extensions == ["pdf", "docx", "xlsx", "pptx"]
+            assert config.allowed_file_extension_set == frozenset(
+                {"pdf", "docx", "xlsx", "pptx"}
+            )
 
     def test_default_values(self):
         """デフォルト値のテスト"""
@@ -130,15 +143,15 @@ class TestOneDriveConfig:
             assert len(targets) == 2
 
             # user1@company.com（フォルダー指定なし）
-            assert targets[0]["email"] == "user1@company.com"
-            assert targets[0]["folder_path"] == ""
-            assert targets[0]["onedrive_path"] == "personal/user1_company_com"
+            assert targets[0].email == "user1@company.com"
+            assert targets[0].folder_path == ""
+            assert targets[0].onedrive_path == "personal/user1_company_com"
 
             # user2@company.com:/Documents/Projects
-            assert targets[1]["email"] == "user2@company.com"
-            assert targets[1]["folder_path"] == "/Documents/Projects"
+            assert targets[1].email == "user2@company.com"
+            assert targets[1].folder_path == "/Documents/Projects"
             assert (
-                targets[1]["onedrive_path"]
+                targets[1].onedrive_path
                 == "personal/user2_company_com/Documents/Projects"
             )
 
@@ -286,8 +299,8 @@ class TestOneDriveConfig:
             targets = config.get_onedrive_targets()
 
             assert len(targets) == 2
-            assert targets[0]["email"] == "user1@company.com"
-            assert targets[1]["email"] == "user2@company.com"
+            assert targets[0].email == "user1@company.com"
+            assert targets[1].email == "user2@company.com"
 
         # OneDriveが無効な場合
         env_vars = {
@@ -316,7 +329,7 @@ class TestOneDriveConfig:
 
             # 有効なメールアドレスのみが含まれる
             assert len(targets) == 1
-            assert targets[0]["email"] == "user@company.com"
+            assert targets[0].email == "user@company.com"
 
 
 class TestDisabledTools:
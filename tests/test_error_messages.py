@@ -3,6 +3,7 @@ from unittest.mock import Mock
 
 import pytest
 import requests
+from openpyxl.utils.exceptions import CellCoordinatesException
 
 from src.error_messages import (
     ErrorCategory,
@@ -195,6 +196,18 @@ class TestExcelErrorClassification:
 
         assert result.category == ErrorCategory.EXCEL_INVALID_FILE
 
+    @pytest.mark.unit
+    def test_excel_invalid_range_coordinates(self):
+        """無効なセル座標（CellCoordinatesException）のエラー分類テスト"""
+        error = CellCoordinatesException("Invalid cell coordinates (ZZZZ0)")
+
+        result = handle_sharepoint_error(
+            error, "excel_parse", excel_context={"range_spec": "ZZZZ0"}
+        )
+
+        assert result.category == ErrorCategory.EXCEL_INVALID_RANGE
+        assert "ZZZZ0" in str(result)
+
     @pytest.mark.unit
     def test_sharepoint_error_not_rewrapped(self):
         """SharePointErrorが再ラップされないことのテスト"""
@@ -1,3 +1,4 @@
+import asyncio
 import base64
 import os
 from unittest.mock import Mock, patch
@@ -5,6 +6,7 @@ from unittest.mock import Mock, patch
 import pytest
 
 from src.server import (
+    _create_auth_provider,
     register_tools,
     sharepoint_docs_download,
     sharepoint_docs_search,
@@ -22,7 +24,7 @@ class TestSharePointDocsSearch:
             "src.server._get_sharepoint_client", return_value=mock_sharepoint_client
         ):
             with patch("src.server.config", mock_config):
-                results = sharepoint_docs_search("test query")
+                results = asyncio.run(sharepoint_docs_search("test query"))
 
                 assert len(results) == 1
                 assert results[0]["title"] == "Test Document 1"
@@ -40,8 +42,8 @@ class TestSharePointDocsSearch:
             "src.server._get_sharepoint_client", return_value=mock_sharepoint_client
         ):
             with patch("src.server.config", mock_config):
-                results = sharepoint_docs_search(
-                    "test query", response_format="compact"
+                results = asyncio.run(
+                    sharepoint_docs_search("test query", response_format="compact")
                 )
 
                 assert len(results) == 1
@@ -53,6 +55,23 @@ class TestSharePointDocsSearch:
                 assert "modified" not in results[0]
                 assert "summary" not in results[0]
 
+    @pytest.mark.unit
+    def test_search_with_columnar_format(self, mock_config, mock_sharepoint_client):
+        """列形式フォーマットでの検索テスト"""
+        with patch(
+            "src.server._get_sharepoint_client", return_value=mock_sharepoint_client
+        ):
+            with patch("src.server.config", mock_config):
+                results = asyncio.run(
+                    sharepoint_docs_search("test query", response_format="columnar")
+                )
+
+                assert results == {
+                    "title": ["Test Document 1"],
+                    "path": ["/sites/test/documents/test1.pdf"],
+                    "extension": ["pdf"],
+                }
+
     @pytest.mark.unit
     def test_search_with_invalid_response_format(
         self, mock_config, mock_sharepoint_client
@@ -62,11 +81,12 @@ class TestSharePointDocsSearch:
             "src.server._get_sharepoint_client", return_value=mock_sharepoint_client
         ):
             with patch("src.server.config", mock_config):
-                results = sharepoint_docs_search(
-                    "test query", response_format="invalid"
+                results = asyncio.run(
+                    sharepoint_docs_search("test query", response_format="invalid")
                 )
 
                 # 無効なフォーマットはdetailedにフォールバックするため、全フィールドが含まれる
+                assert isinstance(results, list)
                 assert len(results) == 1
                 assert "title" in results[0]
                 assert "size" in results[0]
@@ -79,7 +99,11 @@ class TestSharePointDocsSearch:
             "src.server._get_sharepoint_client", return_value=mock_sharepoint_client
         ):
             with patch("src.server.config", mock_config):
-                sharepoint_docs_search("test query", file_extensions=["pdf", "docx"])
+                asyncio.run(
+                    sharepoint_docs_search(
+                        "test query", file_extensions=["pdf", "docx"]
+                    )
+                )
 
                 mock_sharepoint_client.search_documents.assert_called_once_with(
                     query="test query",
@@ -94,7 +118,7 @@ class TestSharePointDocsSearch:
             "src.server._get_sharepoint_client", return_value=mock_sharepoint_client
         ):
             with patch("src.server.config", mock_config):
-                sharepoint_docs_search("test query", max_results=150)
+                asyncio.run(sharepoint_docs_search("test query", max_results=150))
 
                 # 100を超える値は100に制限される
                 mock_sharepoint_client.search_documents.assert_called_once_with(
@@ -114,31 +138,57 @@ class TestSharePointDocsDownload:
             "src.server._get_sharepoint_client", return_value=mock_sharepoint_client
         ):
             with patch("src.server.config", mock_config):
-                result = sharepoint_docs_download("/sites/test/documents/test.pdf")
+                result = asyncio.run(
+                    sharepoint_docs_download("/sites/test/documents/test.pdf")
+                )
 
                 expected_content = base64.b64encode(b"mock file content").decode(
                     "utf-8"
                 )
                 assert result == expected_content
-                mock_sharepoint_client.download_file.assert_called_once_with(
+                mock_sharepoint_client.download_file_stream.assert_called_once_with(
                     "/sites/test/documents/test.pdf"
                 )
 
     @pytest.mark.unit
     def test_download_file_error_handling(self, mock_config, mock_sharepoint_client):
         """ファイルダウンロードエラーハンドリングのテスト"""
-        mock_sharepoint_client.download_file.side_effect = Exception("Download failed")
+        mock_sharepoint_client.download_file_stream.side_effect = Exception(
+            "Download failed"
+        )
 
         with patch(
             "src.server._get_sharepoint_client", return_value=mock_sharepoint_client
         ):
             with patch("src.server.config", mock_config):
                 with pytest.raises(Exception) as exc_info:
-                    sharepoint_docs_download("/sites/test/documents/test.pdf")
+                    asyncio.run(
+                        sharepoint_docs_download("/sites/test/documents/test.pdf")
+                    )
 
                 # エラーハンドリング関数が呼ばれることを確認
                 assert "Download failed" in str(exc_info.value.__cause__)
 
+    @pytest.mark.unit
+    def test_download_file_multiple_chunks(self, mock_config, mock_sharepoint_client):
+        """複数チャンクに分かれたファイルのダウンロードテスト"""
+        content = bytes(range(256)) * 10
+        mock_sharepoint_client.download_file_stream.return_value = [
+            content[:300],
+            content[300:1200],
+            content[1200:],
+        ]
+
+        with patch(
+            "src.server._get_sharepoint_client", return_value=mock_sharepoint_client
+        ):
+            with patch("src.server.config", mock_config):
+                result = asyncio.run(
+                    sharepoint_docs_download("/sites/test/documents/test.pdf")
+                )
+
+                assert result == base64.b64encode(content).decode("ascii")
+
 
 class TestGetSharePointClient:
     """_get_sharepoint_client 関数のテスト"""
@@ -187,6 +237,79 @@ class TestGetSharePointClient:
                     assert mock_client_class.call_count == 1
                     assert client1 == client2
 
+    @pytest.fixture
+    def oauth_client_state(self):
+        """OAuthクライアント関連のモジュール状態を初期化し、テスト後に元へ戻す"""
+        import src.server
+
+        oauth_client = src.server._oauth_client
+        config_validated = src.server._config_validated
+        token = src.server._current_oauth_token.set("")
+        src.server._oauth_client = None
+        src.server._config_validated = False
+        yield
+        src.server._current_oauth_token.reset(token)
+        src.server._oauth_client = oauth_client
+        src.server._config_validated = config_validated
+
+    @pytest.mark.unit
+    def test_oauth_client_shared_across_tokens(self, mock_config, oauth_client_state):
+        """OAuthモードで共有クライアントを使い、トークンをリクエストごとに切り替えるテスト"""
+        mock_config.is_oauth_mode = True
+        with patch("src.server.config", mock_config):
+            with patch("src.server.SharePointSearchClient") as mock_client_class:
+                with patch(
+                    "src.server._get_token_from_request",
+                    side_effect=["token-a", "token-b"],
+                ):
+                    from src.server import _get_sharepoint_client
+
+                    _get_sharepoint_client()
+                    auth = mock_client_class.call_args.kwargs["auth"]
+                    assert auth.get_access_token() == "token-a"
+
+                    _get_sharepoint_client()
+                    assert auth.get_access_token() == "token-b"
+
+                    # クライアントの作成と設定の検証は初回のみ
+                    assert mock_client_class.call_count == 1
+                    mock_config.validate.assert_called_once()
+
+
+class TestCreateAuthProvider:
+    """_create_auth_provider 関数のテスト"""
+
+    @pytest.fixture
+    def oauth_config(self, mock_config):
+        """OAuthモードの設定"""
+        mock_config.is_oauth_mode = True
+        mock_config.oauth_client_id = "test-oauth-client-id"
+        mock_config.oauth_client_secret = "test-oauth-client-secret"
+        mock_config.oauth_server_base_url = "http://localhost:8000"
+        mock_config.get_oauth_allowed_redirect_uris.return_value = None
+        return mock_config
+
+    @pytest.mark.unit
+    def test_required_scopes_use_tenant_from_site_url(self, oauth_config):
+        """サイトURLのテナント名からSharePointスコープを組み立てるテスト"""
+        with patch("src.server.config", oauth_config):
+            with patch("src.server.AzureOIDCProxyForSharePoint") as mock_proxy_class:
+                _create_auth_provider()
+
+                assert mock_proxy_class.call_args.kwargs["required_scopes"] == [
+                    "https://test.sharepoint.com/.default",
+                    "offline_access",
+                ]
+
+    @pytest.mark.unit
+    def test_invalid_site_url_raises(self, oauth_config):
+        """テナント名を取得できないサイトURLでエラーになるテスト"""
+        oauth_config.site_url = ""
+        with patch("src.server.config", oauth_config):
+            with patch("src.server.AzureOIDCProxyForSharePoint"):
+                with pytest.raises(ValueError, match="SharePoint tenant"):
+                    _create_auth_provider()
+
 
 class TestSharePointExcel:
     """sharepoint_excel 関数のテスト"""
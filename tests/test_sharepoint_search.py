@@ -156,3 +156,73 @@ class TestSharePointSearchOneDrive:
             # @allの場合、SharePointフィルターは空になる（テナント全体検索）
             filters = self.client._build_sharepoint_filters(config)
             assert filters == []
+
+
+class TestSharePointSearchDownload:
+    """SharePointファイルダウンロードのテスト"""
+
+    def setup_method(self):
+        """テストメソッド実行前のセットアップ"""
+        self.mock_auth = MagicMock()
+        self.mock_auth.get_access_token.return_value = "test-token"
+        self.client = SharePointSearchClient(
+            site_url="https://test.sharepoint.com/sites/test", auth=self.mock_auth
+        )
+
+    def test_download_file_stream_aligns_chunks(self):
+        """ストリーミングダウンロードのチャンクが3の倍数に揃うことのテスト"""
+        content = bytes(range(256)) * 4
+        mock_response = MagicMock()
+        mock_response.__enter__.return_value = mock_response
+        # 受信サイズが3の倍数に揃っていないケース
+        mock_response.iter_content.return_value = [
+            content[:7],
+            content[7:20],
+            content[20:500],
+            content[500:],
+        ]
+        env_vars = {
+            "SHAREPOINT_BASE_URL": "https://test.sharepoint.com",
+            "SHAREPOINT_SITE_NAME": "test",
+        }
+
+        with patch.dict(os.environ, env_vars, clear=True):
+            with patch(
+                "src.sharepoint_search.requests.get", return_value=mock_response
+            ) as mock_get:
+                chunks = list(
+                    self.client.download_file_stream(
+                        "https://test.sharepoint.com/sites/test/Shared Documents/a.pdf",
+                        chunk_size=12,
+                    )
+                )
+
+        assert b"".join(chunks) == content
+        assert all(len(chunk) % 3 == 0 for chunk in chunks[:-1])
+        assert mock_get.call_args.kwargs["stream"] is True
+
+    def test_download_file_stream_closes_failed_response(self):
+        """フォールバック前に失敗したレスポンスが閉じられることのテスト"""
+        failed_response = MagicMock()
+        failed_response.raise_for_status.side_effect = Exception("404 Not Found")
+        ok_response = MagicMock()
+        ok_response.__enter__.return_value = ok_response
+        ok_response.iter_content.return_value = [b"abc"]
+        env_vars = {
+            "SHAREPOINT_BASE_URL": "https://test.sharepoint.com",
+            "SHAREPOINT_SITE_NAME": "test",
+        }
+
+        with patch.dict(os.environ, env_vars, clear=True):
+            with patch(
+                "src.sharepoint_search.requests.get",
+                side_effect=[failed_response, ok_response],
+            ):
+                chunks = list(
+                    self.client.download_file_stream(
+                        "https://test.sharepoint.com/sites/test/Shared Documents/a.pdf"
+                    )
+                )
+
+        assert chunks == [b"abc"]
+        failed_response.close.assert_called_once()
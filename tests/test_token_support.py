@@ -1,12 +1,18 @@
 """Tests for direct token support in Authorization header"""
 
-from unittest.mock import Mock, patch
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 from fastmcp import Context
 from fastmcp.server.auth import AccessToken
+from fastmcp.server.auth.oidc_proxy import OIDCProxy
 
-from src.server import _get_token_from_request
+from src.server import (
+    AzureOIDCProxyForSharePoint,
+    SharePointTokenVerifier,
+    _get_token_from_request,
+)
 
 
 class TestGetTokenFromRequest:
@@ -138,3 +144,105 @@ class TestGetTokenFromRequest:
 
         # Should match lowercase "bearer"
         assert token == "lowercase-token"
+
+
+class TestSharePointTokenVerifier:
+    """SharePointTokenVerifier tests"""
+
+    @pytest.mark.unit
+    def test_verify_token_reuses_cached_access_token(self):
+        """Test that the same token returns the cached AccessToken"""
+        verifier = SharePointTokenVerifier(required_scopes=["scope"])
+
+        first = asyncio.run(verifier.verify_token("test-token"))
+        second = asyncio.run(verifier.verify_token("test-token"))
+
+        assert first is not None
+        assert first.token == "test-token"
+        assert first.scopes == ["scope"]
+        assert second is first
+
+    @pytest.mark.unit
+    def test_verify_token_cache_expires(self):
+        """Test that an expired cache entry creates a new AccessToken"""
+        verifier = SharePointTokenVerifier()
+
+        with patch("src.server.time.monotonic", return_value=0.0):
+            first = asyncio.run(verifier.verify_token("test-token"))
+        with patch("src.server.time.monotonic", return_value=10_000.0):
+            second = asyncio.run(verifier.verify_token("test-token"))
+
+        assert second is not first
+        assert second is not None
+        assert second.token == "test-token"
+
+    @pytest.mark.unit
+    def test_verify_token_cache_is_bounded(self):
+        """Test that the token cache does not grow beyond its maximum size"""
+        verifier = SharePointTokenVerifier()
+
+        with patch("src.server._TOKEN_CACHE_MAX_SIZE", 2):
+            for token in ["token-1", "token-2", "token-3"]:
+                asyncio.run(verifier.verify_token(token))
+
+        assert len(verifier._token_cache) == 2
+
+    @pytest.mark.unit
+    def test_verify_token_rejects_empty_token(self):
+        """Test that an empty token is rejected"""
+        verifier = SharePointTokenVerifier()
+
+        assert asyncio.run(verifier.verify_token("")) is None
+
+
+class TestAzureOIDCProxyTransactions:
+    """AzureOIDCProxyForSharePoint transaction cleanup tests"""
+
+    @pytest.mark.unit
+    def test_prune_expired_transactions(self):
+        """Test that abandoned transactions are removed after the TTL"""
+        # Skip __init__ to avoid fetching the OIDC configuration
+        proxy = object.__new__(AzureOIDCProxyForSharePoint)
+        proxy._oauth_transactions = {
+            "expired": {"created_at": 0.0},
+            "active": {"created_at": 10_000.0},
+        }
+
+        with patch("src.server.time.time", return_value=10_100.0):
+            proxy._prune_expired_transactions()
+
+        assert list(proxy._oauth_transactions) == ["active"]
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        ("upstream_url", "expected_url"),
+        [
+            (
+                "https://login.example.com/authorize?client_id=abc&resource=https%3A%2F%2Fx&state=s%20t",
+                "https://login.example.com/authorize?client_id=abc&state=s%20t",
+            ),
+            (
+                "https://login.example.com/authorize?resource=x",
+                "https://login.example.com/authorize",
+            ),
+            (
+                "https://login.example.com/authorize?client_id=abc&resource_id=1",
+                "https://login.example.com/authorize?client_id=abc&resource_id=1",
+            ),
+            (
+                "https://login.example.com/authorize?client_id=abc",
+                "https://login.example.com/authorize?client_id=abc",
+            ),
+        ],
+    )
+    def test_authorize_removes_resource_parameter(self, upstream_url, expected_url):
+        """Test that only the 'resource' parameter is removed from the upstream URL"""
+        proxy = object.__new__(AzureOIDCProxyForSharePoint)
+        proxy._oauth_transactions = {}
+
+        with patch.object(
+            OIDCProxy, "authorize", new=AsyncMock(return_value=upstream_url)
+        ):
+            result = asyncio.run(proxy.authorize(Mock(), Mock()))
+
+        assert result == expected_url